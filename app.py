@@ -1,19 +1,18 @@
-from json import loads
+from time import perf_counter
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from uvicorn import run as run_app
 
-from shipping.model.load_production_model import Load_Prod_Model
+from shipping.job_executor.job_manager import Job_Manager
 from shipping.model.predict_from_model import Prediction
-from shipping.model.training_model import Train_Model
-from shipping.validation_insertion.prediction_validation_insertion import (
-    Pred_Validation,
-)
-from shipping.validation_insertion.train_validation_insertion import Train_Validation
+from shipping.model.prediction_batcher import Prediction_Batcher
+from shipping.model.prod_model_registry import Prod_Model_Registry
+from utils.metrics import App_Metrics
 from utils.read_params import read_params
+from utils.tracer import get_tracer
 
 app = FastAPI()
 
@@ -21,6 +20,18 @@ config = read_params()
 
 templates = Jinja2Templates(directory=config["templates"]["dir"])
 
+model_registry = Prod_Model_Registry()
+
+online_pred = Prediction(model_registry)
+
+prediction_batcher = Prediction_Batcher(online_pred)
+
+job_manager = Job_Manager()
+
+app_metrics = App_Metrics()
+
+get_tracer().set_sample_rate(config["tracing"]["serving_sample_rate"])
+
 origins = ["*"]
 
 app.add_middleware(
@@ -32,6 +43,49 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = perf_counter()
+
+    status = 500
+
+    try:
+        response = await call_next(request)
+
+        status = response.status_code
+
+        return response
+
+    finally:
+        route = request.scope.get("route")
+
+        path = route.path if route is not None else "unmatched"
+
+        app_metrics.requests.inc(path=path, method=request.method, status=status)
+
+        app_metrics.request_seconds.observe(perf_counter() - start, path=path)
+
+
+@app.on_event("startup")
+async def start_model_serving():
+    try:
+        model_registry.reload()
+
+    except Exception:
+        pass
+
+    await prediction_batcher.start()
+
+    job_manager.start()
+
+
+@app.on_event("shutdown")
+async def stop_model_serving():
+    await prediction_batcher.stop()
+
+    job_manager.stop()
+
+
 @app.get("/")
 async def index(request: Request):
     return templates.TemplateResponse(
@@ -42,43 +96,76 @@ async def index(request: Request):
 @app.get("/train")
 async def trainRouteClient():
     try:
-        train_val = Train_Validation()
+        job_id = job_manager.submit(
+            "train", callback=lambda job: model_registry.reload(force=True)
+        )
+
+        return Response(
+            f"Training job submitted!! Job id is {job_id}, check /jobs/{job_id} for status"
+        )
+
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
+
+
+@app.get("/predict")
+async def predictRouteClient():
+    try:
+        job_id = job_manager.submit("predict")
 
-        train_val.train_validation()
+        return Response(
+            f"Prediction job submitted!! Job id is {job_id}, check /jobs/{job_id} for status"
+        )
 
-        train_model = Train_Model()
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
 
-        lst = train_model.training_model()
 
-        load_prod_model = Load_Prod_Model()
+@app.get("/jobs/{job_id}")
+async def jobRouteClient(job_id: str):
+    try:
+        job = job_manager.get_job(job_id)
 
-        load_prod_model.load_production_model(lst)
+        if job is None:
+            return Response(f"Error Occurred! {job_id} job id not found")
 
-        return Response("Training successfull!!")
+        return JSONResponse(job)
 
     except Exception as e:
         return Response(f"Error Occurred! {e}")
 
 
-@app.get("/predict")
-async def predictRouteClient():
+@app.post("/predict/online")
+async def onlinePredictRouteClient(request: Request):
     try:
-        pred_val = Pred_Validation()
+        records = await request.json()
 
-        pred_val.pred_validation()
+        model_name, predictions = await prediction_batcher.predict(records)
 
-        pred = Prediction()
+        return JSONResponse({"model": model_name, "predictions": predictions})
 
-        path, json_predictions = pred.predict_from_model()
+    except Exception as e:
+        return Response(f"Error Occurred! {e}")
 
-        return Response(
-            f"Prediction successfull !! Prediction file created at {path} and few of the predictions are {str(loads(json_predictions))}"
-        )
+
+@app.get("/reload")
+def reloadRouteClient():
+    try:
+        entry = model_registry.reload(force=True)
+
+        return Response(f"Reloaded {entry['model_name']} model from production!!")
 
     except Exception as e:
         return Response(f"Error Occurred! {e}")
 
 
+@app.get("/metrics")
+async def metricsRouteClient():
+    return Response(
+        app_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 if __name__ == "__main__":
     app_config = config["app"]
 
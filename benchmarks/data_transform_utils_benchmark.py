@@ -0,0 +1,142 @@
+"""
+Benchmark for the vectorized Data_Transform_Utils kernels against the per-row python loops they replaced
+
+Usage       :   python -m benchmarks.data_transform_utils_benchmark --rows 1000000
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from utils.data_transform_utils import Data_Transform_Utils
+
+
+def loop_clean_weight(df):
+    converted_list_1 = []
+
+    for i in df:
+        converted_list_1.append(round(float(i), 2))
+
+    return converted_list_1
+
+
+def loop_clean_date(df):
+    converted_list_1 = []
+
+    date_diff = df["Scheduled Date"] - df["Delivery Date"]
+
+    for i in date_diff:
+        converted_list_1.append(str(i).split()[0])
+
+    return converted_list_1
+
+
+def loop_clean_customer_location(df):
+    converted_list_1 = []
+
+    for i in df:
+        converted_list_1.append(i.split()[-2])
+
+    return converted_list_1
+
+
+def make_frame(rows, seed=36):
+    rng = np.random.default_rng(seed)
+
+    states = np.array(["OH", "WY", "NC", "VT", "CA", "TX", "NY", "FL"])
+
+    delivery = pd.Timestamp("2015-01-01") + pd.to_timedelta(
+        rng.integers(0, 2000, rows), unit="D"
+    )
+
+    return pd.DataFrame(
+        {
+            "Weight": rng.uniform(1, 100000, rows),
+            "Customer Location": [
+                f"New Michelle, {s} {z}"
+                for s, z in zip(
+                    states[rng.integers(0, len(states), rows)],
+                    rng.integers(10000, 99999, rows),
+                )
+            ],
+            "Delivery Date": delivery,
+            "Scheduled Date": delivery
+            + pd.to_timedelta(rng.integers(-10, 10, rows), unit="D"),
+        }
+    )
+
+
+def time_it(func, *args, repeat=3):
+    best = None
+
+    for _ in range(repeat):
+        start = perf_counter()
+
+        func(*args)
+
+        elapsed = perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+    parser = ArgumentParser()
+
+    parser.add_argument("--rows", type=int, default=1000000)
+
+    parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+
+    utils = Data_Transform_Utils("benchmark.log")
+
+    cases = [
+        (
+            "clean_weight",
+            loop_clean_weight,
+            utils.clean_weight,
+            (df["Weight"],),
+        ),
+        (
+            "clean_customer_location",
+            loop_clean_customer_location,
+            utils.clean_customer_location,
+            (df["Customer Location"],),
+        ),
+        ("clean_date", loop_clean_date, utils.clean_date, (df,)),
+    ]
+
+    print(f"rows : {args.rows}")
+
+    for name, loop_func, vec_func, func_args in cases:
+        expected = pd.Series(loop_func(*func_args))
+
+        result = vec_func(*func_args).reset_index(drop=True)
+
+        if name == "clean_date":
+            expected = expected.astype("int")
+
+        if name == "clean_weight":
+            same = np.allclose(expected.values, result.values)
+
+        else:
+            same = (expected.values == result.values).all()
+
+        assert same, f"{name} results differ"
+
+        loop_time = time_it(loop_func, *func_args, repeat=args.repeat)
+
+        vec_time = time_it(vec_func, *func_args, repeat=args.repeat)
+
+        print(
+            f"{name:<25} loop : {loop_time:8.3f}s  vectorized : {vec_time:8.3f}s  speedup : {loop_time / vec_time:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""
+End to end benchmark of the training and prediction pipeline stages on synthetic datasets of increasing size,
+generated by Data_Generator. Each stage runs in a fresh process against a workspace with its own params file and the local storage backend,
+wall time, rows/sec and peak RSS of every stage are appended to a JSON history file
+
+Usage       :   python -m benchmarks.pipeline_benchmark --rows 10000 100000 1000000 10000000
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+from json import dump, load
+from multiprocessing import get_context
+from os import cpu_count, environ
+from os.path import abspath, isfile, join
+from pickle import dump as pickle_dump
+from pickle import load as pickle_load
+from platform import python_version
+from queue import Empty
+from resource import RUSAGE_CHILDREN, RUSAGE_SELF, getrusage
+from shutil import rmtree
+from subprocess import run
+from tempfile import mkdtemp
+from time import perf_counter
+
+from yaml import safe_dump, safe_load
+
+from utils.data_generator import Data_Generator
+
+STAGES = [
+    "raw_validation",
+    "data_transform",
+    "storage",
+    "preprocessing",
+    "model_finder",
+    "pred_validation",
+    "prediction",
+]
+
+
+def make_params(work_dir, storage, quick):
+    """
+    Writes the params file of the workspace, data, artifacts and logs of the run are kept in the workspace
+    """
+    with open("config/params.yaml") as f:
+        config = safe_load(f)
+
+    config["data"]["raw_data"] = {
+        "train_batch": join(work_dir, "raw", "train"),
+        "pred_batch": join(work_dir, "raw", "pred"),
+    }
+
+    for key in ["train", "pred"]:
+        config["data"][key] = {
+            "good_data_dir": join(work_dir, "data", "good", key),
+            "bad_data_dir": join(work_dir, "data", "bad", key),
+        }
+
+    config["dir"] = {
+        "log": join(work_dir, "logs"),
+        "artifacts": join(work_dir, "artifacts"),
+    }
+
+    config["null_values_csv_file"] = join(work_dir, "artifacts", "null_values.csv")
+
+    config["pred_output_file"] = join(
+        work_dir, "artifacts", "predictions" + config["intermediate_format"]
+    )
+
+    config["train_input_dir"] = join(work_dir, "data", "train_input")
+
+    config["pred_input_dir"] = join(work_dir, "data", "pred_input")
+
+    config["storage"]["backend"] = storage
+
+    config["storage"]["local_dir"] = join(work_dir, "artifacts", "storage")
+
+    config["regex_file"] = abspath(config["regex_file"])
+
+    config["schema_file"] = {k: abspath(v) for k, v in config["schema_file"].items()}
+
+    if quick:
+        config["train_model"] = {
+            model_name: {k: v[:1] for k, v in grid.items()}
+            for model_name, grid in config["train_model"].items()
+        }
+
+        config["model_utils"]["cv"] = 2
+
+        config["model_search"]["strategy"] = {}
+
+    params_file = join(work_dir, "params.yaml")
+
+    with open(params_file, "w") as f:
+        safe_dump(config, f, sort_keys=False)
+
+    return params_file
+
+
+def raw_validation_stage(work_dir):
+    from shipping.raw_data_validation.train_data_validation import (
+        Raw_Train_Data_Validation,
+    )
+
+    raw_data = Raw_Train_Data_Validation()
+
+    date_len, time_len, column_names, n_cols = raw_data.values_from_schema()
+
+    raw_data.validate_raw_fname(raw_data.get_regex_pattern(), date_len, time_len)
+
+    raw_data.validate_col_length(NumberofColumns=n_cols, column_names=column_names)
+
+    raw_data.validate_missing_values_in_col()
+
+
+def data_transform_stage(work_dir):
+    from shipping.data_transform.data_transformation_train import Data_Transform_Train
+
+    Data_Transform_Train().apply_transformations()
+
+
+def storage_stage(work_dir):
+    from shipping.data_type_valid.data_type_valid_train import DB_Operation_Train
+    from utils.read_params import read_params
+
+    config = read_params()
+
+    db_name = config["mongodb"]["shipping_db_name"]
+
+    collection_name = config["mongodb"]["shipping_train_data_collection"]
+
+    db_operation = DB_Operation_Train()
+
+    db_operation.insert_good_data_as_record(db_name, collection_name)
+
+    db_operation.export_collection_to_csv(db_name, collection_name)
+
+
+def preprocessing_stage(work_dir):
+    from shipping.data_ingestion.data_loader_train import Data_Getter_Train
+    from shipping.data_preprocessing.preprocessing import Preprocessor
+    from utils.main_utils import Main_Utils
+    from utils.read_params import read_params
+
+    config = read_params()
+
+    log_file = config["log"]["model_training"]
+
+    preprocessor = Preprocessor(log_file)
+
+    data = Data_Getter_Train(log_file).get_data()
+
+    data = preprocessor.apply_one_hot_encoding(data)
+
+    data = preprocessor.apply_ordinal_encoding(data)
+
+    data = preprocessor.remove_columns(data)
+
+    X, Y = preprocessor.separate_label_feature(data, config["target_col"])
+
+    preprocessor.is_null_present(X)
+
+    X = preprocessor.impute_missing_values(X)
+
+    X = preprocessor.apply_standard_scaler(X)
+
+    Main_Utils().create_model_folders(log_file)
+
+    preprocessor.save_preprocessor()
+
+    return X, Y
+
+
+def model_finder_stage(work_dir, X, Y):
+    from shipping.model_finder.tuner import Model_Finder
+    from utils.read_params import read_params
+
+    return Model_Finder(read_params()["log"]["model_training"]).train_and_save_models(
+        X, Y
+    )
+
+
+def pred_validation_stage(work_dir):
+    from shipping.validation_insertion.prediction_validation_insertion import (
+        Pred_Validation,
+    )
+
+    Pred_Validation().pred_validation()
+
+
+def prediction_stage(work_dir):
+    from shipping.model.predict_from_model import Prediction
+
+    Prediction().predict_from_model()
+
+
+def run_stage(stage, params_file, work_dir, queue):
+    """
+    Runs the stage in the current process and puts wall time and peak RSS of the stage on the queue, inputs and
+    outputs passed between stages in memory are pickled to the workspace outside of the timed section
+    """
+    environ["SHIPPING_PARAMS"] = params_file
+
+    try:
+        xy_file = join(work_dir, "xy.pkl")
+
+        args = ()
+
+        if stage == "model_finder":
+            with open(xy_file, "rb") as f:
+                args = pickle_load(f)
+
+        start = perf_counter()
+
+        result = globals()[stage + "_stage"](work_dir, *args)
+
+        wall_time = perf_counter() - start
+
+        if stage == "preprocessing":
+            with open(xy_file, "wb") as f:
+                pickle_dump(result, f)
+
+        if stage == "model_finder":
+            from shipping.model.load_production_model import Load_Prod_Model
+
+            Load_Prod_Model().load_production_model(result)
+
+        peak_rss_kb = max(
+            getrusage(RUSAGE_SELF).ru_maxrss, getrusage(RUSAGE_CHILDREN).ru_maxrss
+        )
+
+        queue.put({"wall_time": wall_time, "peak_rss_mb": peak_rss_kb / 1024})
+
+    except Exception as e:
+        queue.put({"error": str(e)})
+
+
+def wait_stage(process, queue, timeout):
+    """
+    Waits for the result of the stage process, an error is returned if the process exits without a result, as when it
+    is killed by the OOM killer, or if it runs longer than timeout seconds
+    """
+    start = perf_counter()
+
+    while True:
+        try:
+            return queue.get(timeout=1)
+
+        except Empty:
+            pass
+
+        if not process.is_alive():
+            try:
+                return queue.get(timeout=1)
+
+            except Empty:
+                return {"error": f"stage process exited with {process.exitcode} code"}
+
+        if timeout is not None and perf_counter() - start > timeout:
+            process.terminate()
+
+            return {"error": f"stage did not finish in {timeout}s"}
+
+
+def run_size(rows, args):
+    """
+    Generates rows synthetic records as batch files and runs all the stages on them, the size is recorded as failed
+    if a stage fails
+    """
+    work_dir = mkdtemp(prefix=f"shipping_benchmark_{rows}_")
+
+    try:
+        pred_rows = max(1, int(rows * args.pred_ratio))
+
+        params_file = make_params(work_dir, args.storage, args.quick)
+
+        environ["SHIPPING_PARAMS"] = params_file
+
+        start = perf_counter()
+
+        data_generator = Data_Generator()
+
+        data_generator.generate_batch_files(
+            "train", rows, args.files, join(work_dir, "raw", "train"), args.train_src
+        )
+
+        data_generator.generate_batch_files(
+            "pred", pred_rows, args.files, join(work_dir, "raw", "pred"), args.pred_src
+        )
+
+        print(f"rows : {rows}, generated data in {perf_counter() - start:.1f}s")
+
+        ctx = get_context("spawn")
+
+        stages = {}
+
+        for stage in args.stages:
+            queue = ctx.Queue()
+
+            process = ctx.Process(
+                target=run_stage, args=(stage, params_file, work_dir, queue)
+            )
+
+            process.start()
+
+            result = wait_stage(process, queue, args.stage_timeout)
+
+            process.join()
+
+            if "error" in result:
+                print(f"{stage:<16} failed : {result['error']}")
+
+                stages[stage] = result
+
+                return {"status": "failed", "stages": stages}
+
+            n_rows = pred_rows if stage.startswith("pred") else rows
+
+            result["rows"] = n_rows
+
+            result["rows_per_sec"] = n_rows / result["wall_time"]
+
+            stages[stage] = result
+
+            print(
+                f"{stage:<16} wall : {result['wall_time']:9.2f}s  rows/sec : {result['rows_per_sec']:12.0f}  peak rss : {result['peak_rss_mb']:9.1f} MB"
+            )
+
+        return {"status": "done", "stages": stages}
+
+    finally:
+        if args.keep_workspace:
+            print(f"workspace : {work_dir}")
+
+        else:
+            rmtree(work_dir, ignore_errors=True)
+
+
+def get_git_commit():
+    try:
+        return run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip()
+
+    except Exception:
+        return None
+
+
+def append_history(history_file, record):
+    history = []
+
+    if isfile(history_file):
+        with open(history_file) as f:
+            history = load(f)
+
+    history.append(record)
+
+    with open(history_file, "w") as f:
+        dump(history, f, indent=2)
+
+
+def main():
+    parser = ArgumentParser()
+
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000, 100000, 1000000, 10000000]
+    )
+
+    parser.add_argument("--files", type=int, default=10)
+
+    parser.add_argument("--pred-ratio", type=float, default=0.25)
+
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+
+    parser.add_argument("--storage", choices=["local", "mongodb"], default="local")
+
+    parser.add_argument("--quick", action="store_true")
+
+    parser.add_argument("--train-src", default="data_given/train_batch")
+
+    parser.add_argument("--pred-src", default="data_given/pred_batch")
+
+    parser.add_argument("--history", default="benchmarks/pipeline_history.json")
+
+    parser.add_argument("--keep-workspace", action="store_true")
+
+    parser.add_argument("--stage-timeout", type=float, default=None)
+
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": get_git_commit(),
+        "python": python_version(),
+        "cpu_count": cpu_count(),
+        "storage": args.storage,
+        "quick": args.quick,
+        "files": args.files,
+        "runs": {},
+    }
+
+    for rows in args.rows:
+        record["runs"][str(rows)] = run_size(rows, args)
+
+    append_history(args.history, record)
+
+    print(f"history : {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
-from pandas import read_csv
-
 from utils.logger import App_Logger
+from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
 
 
@@ -21,6 +20,10 @@ class Data_Getter_Pred:
 
         self.pred_csv_file = self.config["export_csv_file"]["pred"]
 
+        self.chunk_size = self.config["prediction"]["chunk_size"]
+
+        self.utils = Main_Utils()
+
         self.log_writer = App_Logger()
 
     def get_data(self):
@@ -41,13 +44,13 @@ class Data_Getter_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Reading pred input csv file", **log_dic)
+            self.log_writer.log("Reading pred input file", **log_dic)
 
             f = self.pred_input_dir + "/" + self.pred_csv_file
 
-            df = read_csv(f)
+            df = self.utils.read_frame(f, self.log_file)
 
-            self.log_writer.log("Read the pred input csv file", **log_dic)
+            self.log_writer.log("Read the pred input file", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
@@ -55,3 +58,38 @@ class Data_Getter_Pred:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def get_data_chunks(self):
+        """
+        Method Name :   get_data_chunks
+        Description :   This method reads the data from the input files s3 bucket where the preding file is stored
+                        in chunks of chunk_size rows
+
+        Output      :   A generator of pandas dataframes is returned
+        On Failure  :   Write an exception log and then raise exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_data_chunks.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.log_writer.log(
+                f"Reading pred input file in chunks of {self.chunk_size} rows", **log_dic
+            )
+
+            f = self.pred_input_dir + "/" + self.pred_csv_file
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return self.utils.read_frame_chunks(f, self.chunk_size, self.log_file)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
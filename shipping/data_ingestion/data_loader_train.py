@@ -1,6 +1,5 @@
-from pandas import read_csv
-
 from utils.logger import App_Logger
+from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
 
 
@@ -21,6 +20,8 @@ class Data_Getter_Train:
 
         self.train_csv_file = self.config["export_csv_file"]["train"]
 
+        self.utils = Main_Utils()
+
         self.log_writer = App_Logger()
 
     def get_data(self):
@@ -41,13 +42,13 @@ class Data_Getter_Train:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Reading train input csv file", **log_dic)
+            self.log_writer.log("Reading train input file", **log_dic)
 
             f = self.train_input_dir + "/" + self.train_csv_file
 
-            df = read_csv(f)
+            df = self.utils.read_frame(f, self.log_file)
 
-            self.log_writer.log("Read the train input csv file", **log_dic)
+            self.log_writer.log("Read the train input file", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
@@ -5,6 +5,7 @@ from sklearn.preprocessing import StandardScaler
 
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
+from utils.model_utils import Model_Utils
 from utils.preprocess_utils import Preprocess_Utils
 from utils.read_params import get_log_dic, read_params
 
@@ -46,14 +47,20 @@ class Preprocessor:
 
         self.knn_params = self.config["knn_imputer"]
 
+        self.preprocessor_name = self.config["preprocessor_name"]
+
         self.log_writer = App_Logger()
 
         self.utils = Main_Utils()
 
         self.preprocess_utils = Preprocess_Utils(self.log_file)
 
+        self.model_utils = Model_Utils()
+
         self.st = StandardScaler()
 
+        self.fitted = {}
+
     def apply_one_hot_encoding(self, data):
         """
         Method Name :   apply_one_hot_encoding
@@ -80,10 +87,21 @@ class Preprocessor:
                 **log_dic,
             )
 
-            df_train = self.preprocess_utils.one_hot_encoding(
-                data, self.cols_to_be_one_hot_encoded
+            if "one_hot_encoder" in self.fitted:
+                data = data.reindex(columns=self.fitted["input_columns"])
+
+            else:
+                self.fitted["input_columns"] = list(data.columns)
+
+            df_train, one_hot_encoder = self.preprocess_utils.one_hot_encoding(
+                data,
+                self.cols_to_be_one_hot_encoded,
+                self.fitted.get("one_hot_encoder"),
+                self.fitted.get("one_hot_lookup"),
             )
 
+            self.fitted["one_hot_encoder"] = one_hot_encoder
+
             self.log_writer.log("Converted dataframe to csv file", **log_dic)
 
             self.log_writer.log(
@@ -123,10 +141,15 @@ class Preprocessor:
                 **log_dic,
             )
 
-            df_train = self.preprocess_utils.ordinal_encoding(
-                data, self.cols_to_be_ordinally_encoded
+            df_train, ordinal_encoder = self.preprocess_utils.ordinal_encoding(
+                data,
+                self.cols_to_be_ordinally_encoded,
+                self.fitted.get("ordinal_encoder"),
+                self.fitted.get("ordinal_lookup"),
             )
 
+            self.fitted["ordinal_encoder"] = ordinal_encoder
+
             self.log_writer.log("Converted dataframe to csv file", **log_dic)
 
             self.log_writer.log(
@@ -215,7 +238,7 @@ class Preprocessor:
     def apply_standard_scaler(self, data):
         """
         Method Name :   apply_standard_scaler
-        Description :   This method applies standard scaling to the dataframe 
+        Description :   This method applies standard scaling to the dataframe, a fitted scaler is only used for transforming
         
         Output      :   A pandas dataframe after applying standard scaling
         On Failure  :   Write an exception log and then raise an exception
@@ -235,7 +258,13 @@ class Preprocessor:
         try:
             self.log_writer.log("Applying standard scaling on the dataframe", **log_dic)
 
-            df_train_standardized = self.st.fit_transform(data)
+            if "scaler" in self.fitted:
+                df_train_standardized = self.fitted["scaler"].transform(data)
+
+            else:
+                df_train_standardized = self.st.fit_transform(data)
+
+                self.fitted["scaler"] = self.st
 
             self.log_writer.log("Applied standard scaling on the dataframe", **log_dic)
 
@@ -323,7 +352,8 @@ class Preprocessor:
     def impute_missing_values(self, data):
         """
         Method Name :   impute_missing_values
-        Description :   This method replaces all the missing values in the dataframe using mean values of the column.
+        Description :   This method replaces all the missing values in the dataframe using KNN imputer, a fitted imputer 
+                        is only used for transforming
         
         Output      :   A dataframe which has all the missing values imputed.
         On Failure  :   Write an exception log and then raise an exception
@@ -343,11 +373,19 @@ class Preprocessor:
         try:
             self.data = data
 
-            imputer = KNNImputer(missing_values=np.nan, **self.knn_params)
+            if "imputer" in self.fitted:
+                self.new_array = self.fitted["imputer"].transform(self.data)
 
-            self.log_writer.log(f"Initialized {imputer.__class__.__name__}", **log_dic)
+            else:
+                imputer = KNNImputer(missing_values=np.nan, **self.knn_params)
 
-            self.new_array = imputer.fit_transform(self.data)
+                self.log_writer.log(
+                    f"Initialized {imputer.__class__.__name__}", **log_dic
+                )
+
+                self.new_array = imputer.fit_transform(self.data)
+
+                self.fitted["imputer"] = imputer
 
             self.new_data = DataFrame(data=self.new_array, columns=self.data.columns)
 
@@ -403,3 +441,76 @@ class Preprocessor:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def save_preprocessor(self):
+        """
+        Method Name :   save_preprocessor
+        Description :   This method saves the fitted encoders, imputer and scaler as one artifact in trained model folder
+        
+        Output      :   Fitted preprocessor is saved to trained model folder
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.save_preprocessor.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.model_utils.save_model(
+                self.fitted, self.log_file, model_name=self.preprocessor_name
+            )
+
+            self.log_writer.log(
+                f"Saved fitted {list(self.fitted.keys())} as preprocessor", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def load_preprocessor(self, stage="prod", preprocessor_file=None):
+        """
+        Method Name :   load_preprocessor
+        Description :   This method loads the fitted encoders, imputer and scaler from the model folder of the stage,
+                        or from preprocessor_file if given
+        
+        Output      :   Fitted preprocessor is loaded and used for transforming the data
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.load_preprocessor.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if preprocessor_file is None:
+                preprocessor_file = self.model_utils.get_model_file(
+                    self.preprocessor_name, stage, self.log_file
+                )
+
+            self.fitted = self.model_utils.load_model(preprocessor_file, self.log_file)
+
+            self.log_writer.log(
+                f"Loaded fitted {list(self.fitted.keys())} from {preprocessor_file}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -1,10 +1,13 @@
-from os import listdir
+from os import listdir, remove
+from os.path import splitext
 
 from numpy import log1p
 from pandas import read_csv
 
+from utils.batch_utils import Batch_Utils
 from utils.data_transform_utils import Data_Transform_Utils
 from utils.logger import App_Logger
+from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
 
 
@@ -16,20 +19,24 @@ class Data_Transform_Pred:
 
         self.good_data_dir = self.config["data"]["pred"]["good_data_dir"]
 
-        self.mean_to_be_filled = self.config["data_transform_cols"]["mean_to_be_filled"]
+        self.transform_steps = self.config["data_transform_steps"]
 
-        self.not_available_to_be_filled = self.config["data_transform_cols"][
-            "not_available_to_be_filled"
-        ]
+        self.intermediate_format = self.config["intermediate_format"]
+
+        self.pred_schema_file = self.config["schema_file"]["pred_schema_file"]
+
+        self.utils = Main_Utils()
 
         self.data_transform_utils = Data_Transform_Utils(self.pred_data_transform_log)
 
+        self.batch_utils = Batch_Utils()
+
         self.log_writer = App_Logger()
 
-    def apply_log1p_transform(self):
+    def log1p_transform(self, pred_data):
         """
-        Method Name :   apply_log1p_transform
-        Description :   This method applies the log1p transformation on the dataframe and returns it 
+        Method Name :   log1p_transform
+        Description :   This method applies the log1p transformation on the cost column of the dataframe
         
         Output      :   A dataframe is returned after applying log1p transformation
         On Failure  :   Write an exception log and then raise an exception
@@ -39,7 +46,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_log1p_transform.__name__,
+            self.log1p_transform.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -47,42 +54,23 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log(
-                "Applying log1p transformation on preding data", **log_dic
-            )
-
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
-
-                pred_data = read_csv(fname)
-
-                cost = pred_data["Cost"]
-
-                pred_data["Cost"] = log1p(abs(cost))
-
-                self.log_writer.log(
-                    f"Applied log1p transformation for {fname} filename", **log_dic
-                )
-
-                pred_data.to_csv(fname, index=None, header=True)
+            cost = pred_data["Cost"]
 
-                self.log_writer.log(
-                    f"Converted dataframe to csv with filename as {fname}", **log_dic
-                )
+            pred_data["Cost"] = log1p(abs(cost))
 
-            self.log_writer.log(
-                "Applied log1p transformation on preding data", **log_dic
-            )
+            self.log_writer.log("Applied log1p transformation on cost column", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return pred_data
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def apply_clean_customer_location_transformation(self):
+    def clean_customer_location_transform(self, pred_data):
         """
-        Method Name :   apply_clean_customer_location_transformation
-        Description :   This method applies the cleans the customer location data and returns the dataframe
+        Method Name :   clean_customer_location_transform
+        Description :   This method cleans the customer location column of the dataframe
         
         Output      :   A dataframe is returned after cleaning the customer location
         On Failure  :   Write an exception log and then raise an exception
@@ -92,7 +80,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_clean_customer_location_transformation.__name__,
+            self.clean_customer_location_transform.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -100,40 +88,25 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Cleaning customer location data", **log_dic)
-
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
-
-                pred_data = read_csv(fname)
-
-                pred_data[
-                    "Customer Location"
-                ] = self.data_transform_utils.clean_customer_location(
-                    pred_data["Customer Location"]
-                )
-
-                self.log_writer.log(
-                    f"Cleaned customer location data for {fname} filename", **log_dic
-                )
-
-                pred_data.to_csv(fname, index=None, header=True)
-
-                self.log_writer.log(
-                    f"Converted dataframe to {fname} filename", **log_dic
-                )
+            pred_data[
+                "Customer Location"
+            ] = self.data_transform_utils.clean_customer_location(
+                pred_data["Customer Location"]
+            )
 
-            self.log_writer.log("Cleaned customer location data", **log_dic)
+            self.log_writer.log("Cleaned customer location column", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return pred_data
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def apply_date_time_transformation(self):
+    def date_time_transform(self, pred_data):
         """
-        Method Name :   apply_date_time_transformation
-        Description :   This method changes the datetime to required format
+        Method Name :   date_time_transform
+        Description :   This method changes the datetime cols to required format and adds the date_diff column
         
         Output      :   A dataframe is returned after changing the datetime format
         On Failure  :   Write an exception log and then raise an exception
@@ -143,7 +116,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_date_time_transformation.__name__,
+            self.date_time_transform.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -151,49 +124,66 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log(
-                "Changing the datetime format in the dataframe", **log_dic
-            )
+            cols_to_change_date = ["Scheduled Date", "Delivery Date"]
 
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
+            for i in cols_to_change_date:
+                pred_data[i] = self.data_transform_utils.change_date_time(
+                    pred_data, i
+                )
 
-                pred_data = read_csv(fname)
+            pred_data["date_diff"] = self.data_transform_utils.clean_date(pred_data)
 
-                cols_to_change_date = ["Scheduled Date", "Delivery Date"]
+            pred_data["date_diff"] = pred_data["date_diff"].astype("int")
 
-                for i in cols_to_change_date:
-                    pred_data[i] = self.data_transform_utils.change_date_time(
-                        pred_data, i
-                    )
+            self.log_writer.log("Cleaned date columns", **log_dic)
 
-                pred_data["date_diff"] = self.data_transform_utils.clean_date(pred_data)
+            self.log_writer.start_log("exit", **log_dic)
 
-                self.log_writer.log(f"Cleaned date for {fname} filename", **log_dic)
+            return pred_data
 
-                pred_data["date_diff"] = pred_data["date_diff"].astype("int")
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
 
-                pred_data.to_csv(fname, index=None, header=True)
+    def clean_weight_transform(self, pred_data):
+        """
+        Method Name :   clean_weight_transform
+        Description :   This method cleans the weight column of the dataframe
+        
+        Output      :   A dataframe is returned after cleaning the weight column
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.clean_weight_transform.__name__,
+            __file__,
+            self.pred_data_transform_log,
+        )
 
-                self.log_writer.log(
-                    f"Converted dataframe to csv for {fname} filename", **log_dic
-                )
+        self.log_writer.start_log("start", **log_dic)
 
-            self.log_writer.log(
-                "Changed the datetime format in the dataframe", **log_dic
+        try:
+            pred_data["Weight"] = self.data_transform_utils.clean_weight(
+                pred_data["Weight"]
             )
 
+            self.log_writer.log("Cleaned weight column", **log_dic)
+
             self.log_writer.start_log("exit", **log_dic)
 
+            return pred_data
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def apply_clean_weight_transformation(self):
+    def transform_dataframe(self, pred_data):
         """
-        Method Name :   apply_clean_weight_transformation
-        Description :   This method cleans the weight column in the dataframe
+        Method Name :   transform_dataframe
+        Description :   This method applies the configured chain of transformations on the dataframe in memory
         
-        Output      :   A dataframe is returned after cleaning the weight column
+        Output      :   A dataframe is returned after applying all the transformation steps
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -201,7 +191,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_clean_weight_transformation.__name__,
+            self.transform_dataframe.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -209,34 +199,27 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log(
-                "Cleaning the weight column in the dataframe", **log_dic
-            )
-
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
-
-                pred_data = read_csv(fname)
-
-                pred_data["Weight"] = self.data_transform_utils.clean_weight(
-                    pred_data["Weight"]
-                )
-
-                pred_data.to_csv(fname, index=None, header=True)
+            for step in self.transform_steps:
+                pred_data = getattr(self, step + "_transform")(pred_data)
 
-            self.log_writer.log("Cleaned the weight column in the dataframe", **log_dic)
+                self.log_writer.log(f"Applied {step} transformation", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return pred_data
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def apply_mean_transformation(self):
+    def transform_file(self, file):
         """
-        Method Name :   apply_mean_transformation
-        Description :   This method fills the dataframe with mean in the cols to be filled with mean
+        Method Name :   transform_file
+        Description :   This method reads the good data file once, applies the configured chain of 
+                        transformations in memory and writes the file back once in the intermediate format
+                        with the dtypes of the schema file
         
-        Output      :   A dataframe is returned after applying mean in the selected cols
+        Output      :   A tuple of written filename and number of transformed rows is returned, the dataframe is
+                        not returned so that it is not sent back through the process pool
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -244,7 +227,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_mean_transformation.__name__,
+            self.transform_file.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -252,31 +235,45 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Applying mean in selected cols", **log_dic)
+            fname = self.good_data_dir + "/" + file
+
+            pred_data = read_csv(fname)
+
+            pred_data = self.transform_dataframe(pred_data)
 
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
+            self.log_writer.log(f"Transformed {fname} filename", **log_dic)
 
-                pred_data = read_csv(fname)
+            col_types = self.utils.read_json(
+                self.pred_schema_file, self.pred_data_transform_log
+            )["ColName"]
 
-                for i in self.mean_to_be_filled:
-                    mean_pred_df = self.data_transform_utils.fill_mean(pred_data[i])
+            out_fname = splitext(fname)[0] + self.intermediate_format
 
-                    mean_pred_df.to_csv(fname, index=None, header=True)
+            self.utils.write_frame(
+                pred_data, out_fname, self.pred_data_transform_log, col_types
+            )
 
-            self.log_writer.log("Applied mean in selected cols", **log_dic)
+            if out_fname != fname:
+                remove(fname)
+
+            self.log_writer.log(
+                f"Converted dataframe to {out_fname} filename", **log_dic
+            )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return out_fname, len(pred_data)
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def apply_fill_to_not_avaiable_cols(self):
+    def apply_transformations(self):
         """
-        Method Name :   apply_fill_to_not_avaiable_cols
-        Description :   This method fills the dataframe with mode to other cols
+        Method Name :   apply_transformations
+        Description :   This method transforms all the good data files concurrently, each file is read once,
+                        transformed in memory and written back once
         
-        Output      :   A dataframe is returned after applying mode to other cols
+        Output      :   A list of tuple of written filename and number of transformed rows is returned
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -284,7 +281,7 @@ class Data_Transform_Pred:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.apply_fill_to_not_avaiable_cols.__name__,
+            self.apply_transformations.__name__,
             __file__,
             self.pred_data_transform_log,
         )
@@ -292,23 +289,29 @@ class Data_Transform_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Applying mode to other cols", **log_dic)
-
-            for file in listdir(self.good_data_dir):
-                fname = self.good_data_dir + "/" + file
-
-                pred_data = read_csv(fname)
+            self.log_writer.log(
+                f"Applying {self.transform_steps} transformations on preding data",
+                **log_dic,
+            )
 
-                for i in self.not_available_to_be_filled:
-                    fill_not_available_df = self.data_transform_utils.fill_not_available(
-                        pred_data[i]
-                    )
+            files = sorted(
+                f for f in listdir(self.good_data_dir) if f.endswith(".csv")
+            )
 
-                    fill_not_available_df.to_csv(fname, index=None, header=True)
+            lst = self.batch_utils.run_batch(
+                self.transform_file,
+                [(file,) for file in files],
+                self.pred_data_transform_log,
+            )
 
-            self.log_writer.log("Applied mode to other cols", **log_dic)
+            self.log_writer.log(
+                f"Applied {self.transform_steps} transformations on preding data",
+                **log_dic,
+            )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return lst
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
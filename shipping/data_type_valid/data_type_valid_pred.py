@@ -1,4 +1,7 @@
-from shipping.mongodb_operations.mongo_operations import MongoDB_Operation
+from os import listdir
+from os.path import splitext
+
+from shipping.storage_operations.storage_operation import get_storage_operation
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
@@ -25,18 +28,24 @@ class DB_Operation_Pred:
 
         self.pred_export_csv_log = self.config["log"]["pred_export_csv"]
 
+        self.pred_schema_file = self.config["schema_file"]["pred_schema_file"]
+
         self.utils = Main_Utils()
 
-        self.mongo = MongoDB_Operation()
+        self.storage = get_storage_operation()
 
         self.log_writer = App_Logger()
 
-    def insert_good_data_as_record(self, good_data_db_name, good_data_collection_name):
+    def insert_good_data_as_record(
+        self, good_data_db_name, good_data_collection_name, data_files=None
+    ):
         """
         Method Name :   insert_good_data_as_record
-        Description :   This method inserts the good data in MongoDB as collection
+        Description :   This method inserts the good data in the storage backend as collection
 
-        Output      :   A MongoDB collection is created with good data present in it
+        Output      :   A collection is created with good data present in it and number of inserted records is
+                        returned. If data_files (list of good data files) is passed, the good data folder is not
+                        listed again
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -52,37 +61,49 @@ class DB_Operation_Pred:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log("Inserting dataframes as records in mongodb", **log_dic)
-
-            lst = self.utils.read_csv_from_folder(
-                self.good_data_pred_dir, self.pred_db_insert_log
+            self.log_writer.log(
+                "Inserting good data files as records in storage backend", **log_dic
             )
 
-            [
-                self.mongo.insert_dataframe_as_record(
-                    f,
-                    good_data_db_name,
-                    good_data_collection_name,
-                    self.pred_db_insert_log,
+            if data_files is None:
+                data_files = [
+                    self.good_data_pred_dir + "/" + f
+                    for f in sorted(listdir(self.good_data_pred_dir))
+                    if splitext(f)[1] in (".csv", ".parquet", ".feather")
+                ]
+
+            else:
+                self.log_writer.log(
+                    "Using transformed data files without listing good data folder",
+                    **log_dic,
                 )
-                for f in lst
-            ]
+
+            n_records = self.storage.insert_files_as_record(
+                data_files,
+                good_data_db_name,
+                good_data_collection_name,
+                self.pred_db_insert_log,
+            )
 
             self.log_writer.log(
-                "Inserted list of dataframe as collection record in mongodb", **log_dic
+                "Inserted good data files as collection record in storage backend",
+                **log_dic,
             )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return n_records
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
     def export_collection_to_csv(self, good_data_db_name, good_data_collection_name):
         """
-        Method Name :   insert_good_data_as_record
-        Description :   This method inserts the good data in MongoDB as collection
+        Method Name :   export_collection_to_csv
+        Description :   This method exports the good data collection to the input file in chunks
 
-        Output      :   A csv file stored in input files bucket, containing good data which was stored in MongoDB
+        Output      :   A csv file stored in input files bucket, containing good data which was stored in the storage backend,
+                        number of exported records is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -100,17 +121,22 @@ class DB_Operation_Pred:
         try:
             self.log_writer.log("Exporting good data collection as csv file", **log_dic)
 
-            df = self.mongo.get_collection_as_dataframe(
-                good_data_db_name, good_data_collection_name, self.pred_export_csv_log
-            )
-
-            self.log_writer.log("Got good data collection as dataframe", **log_dic)
-
             self.utils.create_directory(self.pred_input_dir, self.pred_export_csv_log)
 
             export_f = self.pred_input_dir + "/" + self.pred_export_csv_file
 
-            df.to_csv(export_f, index=None, header=True)
+            col_types = self.utils.read_json(
+                self.pred_schema_file, self.pred_export_csv_log
+            )["ColName"]
+
+            n_records = self.storage.export_collection_to_file(
+                good_data_db_name,
+                good_data_collection_name,
+                export_f,
+                self.pred_export_csv_log,
+                col_types,
+                incremental=True,
+            )
 
             self.log_writer.log(
                 f"Converted good data collection dataframe to {export_f} csv file name",
@@ -119,5 +145,7 @@ class DB_Operation_Pred:
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return n_records
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,416 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from json import loads
+from multiprocessing import Manager, Process
+from uuid import uuid4
+
+from shipping.model.load_production_model import Load_Prod_Model
+from shipping.model.predict_from_model import Prediction
+from shipping.model.training_model import Train_Model
+from shipping.validation_insertion.prediction_validation_insertion import (
+    Pred_Validation,
+)
+from shipping.validation_insertion.train_validation_insertion import Train_Validation
+from utils.logger import App_Logger
+from utils.metrics import App_Metrics
+from utils.read_params import get_log_dic, read_params
+from utils.run_report import Run_Report
+from utils.tracer import get_tracer, traced
+
+
+def update_job(jobs, job_id, **kwargs):
+    """
+    Method Name :   update_job
+    Description :   This method updates the job details in the shared jobs dict
+
+    Output      :   Job details are updated
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    job = dict(jobs[job_id])
+
+    job.update(kwargs)
+
+    jobs[job_id] = job
+
+
+def update_progress(jobs, job_id, stage, stages):
+    """
+    Method Name :   update_progress
+    Description :   This method updates the current stage of the job
+
+    Output      :   Job progress is updated
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    update_job(
+        jobs,
+        job_id,
+        stage=stage,
+        progress=f"{stages.index(stage) + 1}/{len(stages)}",
+    )
+
+
+@traced
+def run_train_job(job_id, jobs):
+    """
+    Method Name :   run_train_job
+    Description :   This method runs train validation, model training and pushes the best model to production,
+                    the stages of the job are recorded in one run report
+
+    Output      :   A dict of job result is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    stages = ["train_validation", "model_training", "load_production_model"]
+
+    metrics = App_Metrics()
+
+    report = Run_Report("train")
+
+    try:
+        update_progress(jobs, job_id, "train_validation", stages)
+
+        with metrics.stage_seconds.time(stage="train_validation"):
+            train_val = Train_Validation()
+
+            train_val.train_validation(report)
+
+        update_progress(jobs, job_id, "model_training", stages)
+
+        with metrics.stage_seconds.time(stage="model_training"):
+            train_model = Train_Model()
+
+            lst = train_model.training_model(report)
+
+        update_progress(jobs, job_id, "load_production_model", stages)
+
+        with metrics.stage_seconds.time(stage="load_production_model"):
+            with report.stage("load_production_model"):
+                load_prod_model = Load_Prod_Model()
+
+                load_prod_model.load_production_model(lst)
+
+        prod_model_file = load_prod_model.model_utils.get_prod_model_file(
+            load_prod_model.load_prod_model_log
+        )
+
+    except Exception as e:
+        report.save("failed")
+
+        raise e
+
+    return {"prod_model_file": prod_model_file, "run_report_file": report.save()}
+
+
+@traced
+def run_pred_job(job_id, jobs):
+    """
+    Method Name :   run_pred_job
+    Description :   This method runs prediction validation and batch prediction, the stages of the job are
+                    recorded in one run report
+
+    Output      :   A dict of job result is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    stages = ["pred_validation", "prediction"]
+
+    metrics = App_Metrics()
+
+    report = Run_Report("pred")
+
+    try:
+        update_progress(jobs, job_id, "pred_validation", stages)
+
+        with metrics.stage_seconds.time(stage="pred_validation"):
+            pred_val = Pred_Validation()
+
+            pred_val.pred_validation(report)
+
+        update_progress(jobs, job_id, "prediction", stages)
+
+        with metrics.stage_seconds.time(stage="prediction"):
+            pred = Prediction()
+
+            path, json_predictions = pred.predict_from_model(report)
+
+    except Exception as e:
+        report.save("failed")
+
+        raise e
+
+    return {
+        "prediction_file": path,
+        "predictions_head": loads(json_predictions),
+        "run_report_file": report.save(),
+    }
+
+
+JOBS = {"train": run_train_job, "predict": run_pred_job}
+
+
+def run_job(kind, job_id, jobs):
+    """
+    Method Name :   run_job
+    Description :   This method runs the job in the job process and records its status and result, the metrics
+                    inherited from the app process are reset so that the job status carries only the metrics of
+                    the job. The spans of the job are exported as trace file
+
+    Output      :   Job status, result, metrics and trace file are updated in the shared jobs dict
+    On Failure  :   Job is marked as failed with the error
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    metrics = App_Metrics()
+
+    metrics.reset()
+
+    update_job(jobs, job_id, status="running", started_at=datetime.now().isoformat())
+
+    try:
+        result = JOBS[kind](job_id, jobs)
+
+        update_job(
+            jobs,
+            job_id,
+            status="done",
+            result=result,
+            metrics=metrics.dump(),
+            trace_file=get_tracer().export(),
+            finished_at=datetime.now().isoformat(),
+        )
+
+    except Exception as e:
+        update_job(
+            jobs,
+            job_id,
+            status="failed",
+            error=str(e),
+            metrics=metrics.dump(),
+            trace_file=get_tracer().export(),
+            finished_at=datetime.now().isoformat(),
+        )
+
+
+class Job_Manager:
+    """
+    Description :   This class runs training and batch prediction as background jobs, each job runs in its own
+                    process and at most n_workers jobs run at the same time
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.log_writer = App_Logger()
+
+        self.job_log = self.config["log"]["job_manager"]
+
+        self.n_workers = self.config["jobs"]["n_workers"]
+
+        self.metrics = App_Metrics()
+
+        self.manager = None
+
+        self.jobs = None
+
+        self.executor = None
+
+    def start(self):
+        """
+        Method Name :   start
+        Description :   This method starts the shared jobs dict and the job executor
+
+        Output      :   Job manager is started
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.start.__name__, __file__, self.job_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.manager = Manager()
+
+            self.jobs = self.manager.dict()
+
+            self.executor = ThreadPoolExecutor(max_workers=self.n_workers)
+
+            self.log_writer.log(
+                f"Started job manager with {self.n_workers} workers", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def stop(self):
+        """
+        Method Name :   stop
+        Description :   This method stops the job executor and the shared jobs dict
+
+        Output      :   Job manager is stopped
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.stop.__name__, __file__, self.job_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+
+            if self.manager is not None:
+                self.manager.shutdown()
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def submit(self, kind, callback=None):
+        """
+        Method Name :   submit
+        Description :   This method queues a train or predict job, callback is called with the job details once the
+                        job is done
+
+        Output      :   Job id is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.submit.__name__, __file__, self.job_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if kind not in JOBS:
+                raise ValueError(
+                    f"{kind} is not a valid job, expected one of {list(JOBS)}"
+                )
+
+            if self.executor is None:
+                self.start()
+
+            job_id = uuid4().hex
+
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "kind": kind,
+                "status": "queued",
+                "stage": None,
+                "progress": None,
+                "result": None,
+                "error": None,
+                "metrics": None,
+                "trace_file": None,
+                "submitted_at": datetime.now().isoformat(),
+            }
+
+            self.executor.submit(self.run_process, kind, job_id, callback)
+
+            self.log_writer.log(f"Submitted {kind} job with {job_id} job id", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return job_id
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def run_process(self, kind, job_id, callback):
+        """
+        Method Name :   run_process
+        Description :   This method runs the job in a separate process and waits for it. The job process is not a
+                        daemon, so the stages can still start their own worker processes. The metrics of the job
+                        are merged in the metrics of the app process
+
+        Output      :   Job is run and callback is called if the job is done
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.run_process.__name__, __file__, self.job_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            process = Process(target=run_job, args=(kind, job_id, self.jobs))
+
+            process.start()
+
+            process.join()
+
+            job = self.get_job(job_id)
+
+            if job["status"] not in ("done", "failed"):
+                update_job(
+                    self.jobs,
+                    job_id,
+                    status="failed",
+                    error=f"Job process exited with {process.exitcode} exit code",
+                    finished_at=datetime.now().isoformat(),
+                )
+
+            job = self.get_job(job_id)
+
+            self.metrics.merge(job["metrics"])
+
+            self.metrics.jobs.inc(kind=kind, status=job["status"])
+
+            self.log_writer.log(
+                f"{kind} job with {job_id} job id finished as {job['status']}",
+                **log_dic,
+            )
+
+            if callback is not None and self.get_job(job_id)["status"] == "done":
+                callback(self.get_job(job_id))
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_job(self, job_id):
+        """
+        Method Name :   get_job
+        Description :   This method gets the status, progress and result of the job
+
+        Output      :   A dict of job details is returned, None if the job id is unknown
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.jobs is None or job_id not in self.jobs:
+            return None
+
+        return dict(self.jobs[job_id])
@@ -1,4 +1,8 @@
-from shutil import copy
+from datetime import datetime
+from json import dump
+from os import listdir, makedirs, replace
+from os.path import isdir, join
+from shutil import copy, rmtree
 
 from utils.logger import App_Logger
 from utils.model_utils import Model_Utils
@@ -15,12 +19,57 @@ class Load_Prod_Model:
 
         self.load_prod_model_log = self.config["log"]["load_prod_model"]
 
+        self.preprocessor_name = self.config["preprocessor_name"]
+
+        self.save_format = self.config["save_format"]
+
+        self.prod_pushes_to_keep = self.config["prod_pushes_to_keep"]
+
+    def copy_file(self, src_file, dst_file):
+        """
+        Method Name :   copy_file
+        Description :   This method copies the file to a temporary file next to the destination and then renames it,
+                        so that the destination file is never read partially written
+
+        Output      :   File is copied to destination file
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        copy(src_file, dst_file + ".tmp")
+
+        replace(dst_file + ".tmp", dst_file)
+
+    def remove_old_pushes(self, prod_model_dir, push_id):
+        """
+        Method Name :   remove_old_pushes
+        Description :   This method removes the push folders in the prod model folder apart from the latest pushes
+                        which are kept for serving and rollback, the current push is never removed
+
+        Output      :   Old push folders are removed from the prod model folder
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        push_ids = sorted(
+            f for f in listdir(prod_model_dir) if isdir(join(prod_model_dir, f))
+        )
+
+        for old_push_id in push_ids[: -self.prod_pushes_to_keep]:
+            if old_push_id != push_id:
+                rmtree(join(prod_model_dir, old_push_id), ignore_errors=True)
+
     def load_production_model(self, lst):
         """
         Method Name :   load_production_model
-        Description :   This method is responsible for sending the best model to production and rest of the models to staging
+        Description :   This method is responsible for sending the best model along with the fitted preprocessor to production 
+                        and rest of the models to staging, the best model and preprocessor are copied into a new push
+                        folder and the prod manifest which names both files is written last, so that a model is always
+                        served with its own preprocessor
         
-        Output      :   Best model is pushed to production and rest of the models are pushed to staging
+        Output      :   Best model and preprocessor are pushed to production and rest of the models are pushed to staging
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -47,6 +96,16 @@ class Load_Prod_Model:
 
             self.log_writer.log(f"Got best model as {best_model} model", **log_dic)
 
+            prod_model_dir = self.config.model_dir("prod")
+
+            push_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+            push_dir = join(prod_model_dir, push_id)
+
+            makedirs(push_dir, exist_ok=True)
+
+            self.log_writer.log(f"Created {push_dir} push folder", **log_dic)
+
             trained_model_lst = self.model_utils.get_trained_model_name_list(
                 lst, self.load_prod_model_log
             )
@@ -64,9 +123,7 @@ class Load_Prod_Model:
                 self.log_writer.log(f"Got {model} trained model file", **log_dic)
 
                 if model == best_model:
-                    prod_model_file = self.model_utils.get_model_file(
-                        model, "prod", self.load_prod_model_log
-                    )
+                    prod_model_file = join(push_dir, model + self.save_format)
 
                     self.log_writer.log(f"Got {model} prod model file", **log_dic)
 
@@ -75,7 +132,7 @@ class Load_Prod_Model:
                         **log_dic,
                     )
 
-                    copy(trained_model_file, prod_model_file)
+                    self.copy_file(trained_model_file, prod_model_file)
 
                     self.log_writer.log(
                         f"Copied {trained_model_file} to {prod_model_file}", **log_dic
@@ -93,11 +150,56 @@ class Load_Prod_Model:
                         **log_dic,
                     )
 
-                    copy(trained_model_file, stag_model_file)
+                    self.copy_file(trained_model_file, stag_model_file)
 
                     self.log_writer.log(
                         f"Copied {trained_model_file} to {stag_model_file}", **log_dic
                     )
 
+            trained_preprocessor_file = self.model_utils.get_model_file(
+                self.preprocessor_name, "trained", self.load_prod_model_log
+            )
+
+            prod_preprocessor_file = join(
+                push_dir, self.preprocessor_name + self.save_format
+            )
+
+            self.copy_file(trained_preprocessor_file, prod_preprocessor_file)
+
+            self.log_writer.log(
+                f"Copied {trained_preprocessor_file} to {prod_preprocessor_file}",
+                **log_dic,
+            )
+
+            prod_manifest_file = self.model_utils.prod_manifest_file
+
+            with open(prod_manifest_file + ".tmp", "w") as f:
+                dump(
+                    {
+                        "model_name": best_model,
+                        "model_file": join(push_id, best_model + self.save_format),
+                        "preprocessor_file": join(
+                            push_id, self.preprocessor_name + self.save_format
+                        ),
+                        "pushed_at": datetime.now().isoformat(),
+                    },
+                    f,
+                )
+
+            replace(prod_manifest_file + ".tmp", prod_manifest_file)
+
+            self.log_writer.log(
+                f"Wrote {prod_manifest_file} for {best_model} prod model", **log_dic
+            )
+
+            self.remove_old_pushes(prod_model_dir, push_id)
+
+            self.log_writer.log(
+                f"Removed push folders older than the latest {self.prod_pushes_to_keep}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -1,19 +1,27 @@
-from pandas import DataFrame
+from os.path import basename
+
+import numpy as np
+from pandas import DataFrame, to_numeric
 
 from shipping.data_ingestion.data_loader_prediction import Data_Getter_Pred
 from shipping.data_preprocessing.preprocessing import Preprocessor
+from shipping.data_transform.data_transformation_pred import Data_Transform_Pred
 from utils.logger import App_Logger
+from utils.main_utils import Main_Utils
+from utils.metrics import App_Metrics
 from utils.model_utils import Model_Utils
 from utils.read_params import get_log_dic, read_params
+from utils.run_report import Run_Report
+from utils.tracer import get_tracer
 
 
 class Prediction:
-    def __init__(self):
+    def __init__(self, model_registry=None):
         self.config = read_params()
 
         self.pred_log = self.config["log"]["pred_main"]
 
-        self.predictions_csv_file = self.config["pred_output_file"]
+        self.predictions_file = self.config["pred_output_file"]
 
         self.log_writer = App_Logger()
 
@@ -23,12 +31,94 @@ class Prediction:
 
         self.model_utils = Model_Utils()
 
-    def predict_from_model(self):
+        self.utils = Main_Utils()
+
+        self.metrics = App_Metrics()
+
+        self.data_transform = Data_Transform_Pred()
+
+        self.model_registry = model_registry
+
+        self.target_col = self.config["target_col"]
+
+        self.pred_schema_file = self.config["schema_file"]["pred_schema_file"]
+
+        self.max_online_records = self.config["online_prediction"]["max_records"]
+
+        self.derived_cols = self.config["online_prediction"]["derived_cols"]
+
+        self.encoded_cols = (
+            self.config["preprocess_cols"]["one_hot_encode"]
+            + self.config["preprocess_cols"]["ordinal_encode"]
+        )
+
+        self.pred_col_names = None
+
+        self.predictions_head = None
+
+        self.prod_model_name = None
+
+    def get_prod_model(self):
         """
-        Method Name :   predict_from_model
-        Description :   This method is responsible for using the trained model and get predictions based on the prediction data
+        Method Name :   get_prod_model
+        Description :   This method gets the prod model and sets the fitted preprocessor and the prod model name, the
+                        resident model from model registry is used if available else they are loaded from the prod
+                        model folder
+        
+        Output      :   Prod model is returned and fitted preprocessor and prod model name are set
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_prod_model.__name__, __file__, self.pred_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if self.model_registry is None:
+                (
+                    prod_model_file,
+                    prod_preprocessor_file,
+                ) = self.model_utils.get_prod_files(self.pred_log)
+
+                self.preprocessor.load_preprocessor(
+                    preprocessor_file=prod_preprocessor_file
+                )
+
+                prod_model = self.model_utils.load_model(prod_model_file, self.pred_log)
+
+                self.prod_model_name = basename(prod_model_file).split(".")[0]
+
+            else:
+                entry = self.model_registry.get_model()
+
+                self.preprocessor.fitted = dict(entry["preprocessor"])
+
+                prod_model = entry["model"]
+
+                self.prod_model_name = entry["model_name"]
+
+                self.log_writer.log(
+                    f"Using resident {entry['model_name']} prod model", **log_dic
+                )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return prod_model
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_predictions(self, data, write_null_values=True, prod_model=None):
+        """
+        Method Name :   get_predictions
+        Description :   This method applies the fitted preprocessing on the dataframe and gets predictions from the prod model,
+                        the prod model is got if not given
         
-        Output      :   Trained models are used for prediction and results are stored in predictions csv file
+        Output      :   An array of predictions is returned
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -36,7 +126,7 @@ class Prediction:
         """
         log_dic = get_log_dic(
             self.__class__.__name__,
-            self.predict_from_model.__name__,
+            self.get_predictions.__name__,
             __file__,
             self.pred_log,
         )
@@ -44,11 +134,8 @@ class Prediction:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            self.log_writer.log(
-                "Started getting predictions based on prediction data", **log_dic
-            )
-
-            data = self.data_getter_pred.get_data()
+            if prod_model is None:
+                prod_model = self.get_prod_model()
 
             data = self.preprocessor.apply_one_hot_encoding(data)
 
@@ -58,37 +145,271 @@ class Prediction:
 
             data = self.preprocessor.remove_columns(data)
 
-            is_null_present = self.preprocessor.is_null_present(data)
+            if write_null_values:
+                is_null_present = self.preprocessor.is_null_present(data)
+
+            else:
+                is_null_present = bool(data.isna().values.any())
 
             if is_null_present:
                 data = self.preprocessor.impute_missing_values(data)
 
             X = self.preprocessor.apply_standard_scaler(data)
 
-            prod_model_file = self.model_utils.get_prod_model_file(self.pred_log)
+            result = prod_model.predict(X)
+
+            self.log_writer.log(
+                "Used model in production to get predictions", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return result
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_chunk_predictions(self, prod_model):
+        """
+        Method Name :   get_chunk_predictions
+        Description :   This method gets predictions for the prediction data chunk by chunk with the fitted preprocessing,
+                        the head of the first chunk of predictions is kept in predictions_head
+        
+        Output      :   A generator of dataframes of predictions is returned
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_chunk_predictions.__name__,
+            __file__,
+            self.pred_log,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.predictions_head = DataFrame(columns=["Predictions"])
+
+            for i, data in enumerate(self.data_getter_pred.get_data_chunks()):
+                result = DataFrame(
+                    self.get_predictions(data, i == 0, prod_model),
+                    columns=["Predictions"],
+                )
+
+                if i == 0:
+                    self.predictions_head = result.head()
+
+                self.metrics.stage_rows.inc(len(result), stage="prediction")
 
-            prod_model = self.model_utils.load_model(prod_model_file, self.pred_log)
+                self.log_writer.log(
+                    f"Got predictions for {len(result)} records of chunk {i}", **log_dic
+                )
 
-            result = list(prod_model.predict(X))
+                yield result
 
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def predict_from_model(self, run_report=None):
+        """
+        Method Name :   predict_from_model
+        Description :   This method is responsible for using the trained model and get predictions based on the prediction data,
+                        the prediction data is read, predicted and written in chunks of chunk_size rows so that memory
+                        does not grow with the size of prediction data
+        
+        Output      :   Trained models are used for prediction and results are stored in predictions file, the stages
+                        are recorded in run_report and a run report is saved if run_report is not given
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.predict_from_model.__name__,
+            __file__,
+            self.pred_log,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        report = run_report or Run_Report("pred")
+
+        error = None
+
+        try:
             self.log_writer.log(
-                "Used model in production to get predictions", **log_dic
+                "Started getting predictions based on prediction data", **log_dic
             )
 
-            result = DataFrame(result, columns=["Predictions"])
+            with report.stage("load_prod_model"):
+                prod_model = self.get_prod_model()
+
+            with report.stage("prediction") as stage:
+                n_records = self.utils.write_frame_chunks(
+                    self.get_chunk_predictions(prod_model),
+                    self.predictions_file,
+                    self.pred_log,
+                )
 
-            self.log_writer.log("Created dataframe for the predictions", **log_dic)
+                stage["rows_out"] = n_records
 
-            result.to_csv(self.predictions_csv_file, index=None, header=True)
+            self.log_writer.log(f"Got predictions for {n_records} records", **log_dic)
 
             self.log_writer.log(
-                "Prediction are made using the trained model and results are stored in csv file",
+                f"Prediction are made using the trained model and results are stored in {self.predictions_file} file",
                 **log_dic
             )
 
+            if run_report is None:
+                report.save()
+
             self.log_writer.start_log("exit", **log_dic)
 
-            return self.predictions_csv_file, result.head().to_json(orient="records")
+            return (
+                self.predictions_file,
+                self.predictions_head.to_json(orient="records"),
+            )
 
         except Exception as e:
+            error = str(e)
+
+            if run_report is None:
+                report.save("failed")
+
             raise e
+
+        finally:
+            get_tracer().end_span(
+                f"{log_dic['class_name']}.{log_dic['method_name']}", error
+            )
+
+    def get_records_as_dataframe(self, records, check_size=True):
+        """
+        Method Name :   get_records_as_dataframe
+        Description :   This method validates the shipment records against the input columns of the fitted preprocessor
+                        and converts them to dataframe, the target column and the columns derived by the data
+                        transformations are not expected. check_size is disabled when the records are a micro batch
+                        of already checked requests
+        
+        Output      :   A dataframe of shipment records with schema dtypes is returned, the features which are not in
+                        the prediction schema are numeric unless they are encoded
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_records_as_dataframe.__name__,
+            __file__,
+            self.pred_log,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            if isinstance(records, dict):
+                records = [records]
+
+            if not isinstance(records, list) or len(records) == 0:
+                raise ValueError("Expected a shipment record or a list of records")
+
+            if check_size and len(records) > self.max_online_records:
+                raise ValueError(
+                    f"Got {len(records)} records, at most {self.max_online_records} records are allowed"
+                )
+
+            if self.pred_col_names is None:
+                self.pred_col_names = self.utils.read_json(
+                    self.pred_schema_file, self.pred_log
+                )["ColName"]
+
+            feature_cols = [
+                c
+                for c in self.preprocessor.fitted["input_columns"]
+                if c != self.target_col and c not in self.derived_cols
+            ]
+
+            for i, record in enumerate(records):
+                missing_cols = [c for c in feature_cols if c not in record]
+
+                if missing_cols:
+                    raise ValueError(f"Record {i} is missing {missing_cols} features")
+
+            data = DataFrame.from_records(records, columns=feature_cols)
+
+            for col in feature_cols:
+                dtype = self.pred_col_names.get(
+                    col, "string" if col in self.encoded_cols else "float"
+                )
+
+                if dtype == "float":
+                    data[col] = to_numeric(data[col], errors="coerce")
+
+                else:
+                    data[col] = data[col].astype("object")
+
+            if self.target_col not in data.columns:
+                data[self.target_col] = np.nan
+
+            self.log_writer.log(
+                f"Converted {len(records)} records to dataframe", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return data
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def predict_from_records(self, records, check_size=True):
+        """
+        Method Name :   predict_from_records
+        Description :   This method gets predictions for shipment records in memory, the records are cleaned with the 
+                        prediction data transformations and the fitted preprocessing without touching the data folders or database,
+                        the prod model is got first so that the records are validated against its preprocessor
+        
+        Output      :   A tuple of the name of the prod model used and a list of predictions in the same order as
+                        records is returned
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.predict_from_records.__name__,
+            __file__,
+            self.pred_log,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            prod_model = self.get_prod_model()
+
+            prod_model_name = self.prod_model_name
+
+            data = self.get_records_as_dataframe(records, check_size)
+
+            data = self.data_transform.transform_dataframe(data)
+
+            result = self.get_predictions(data, False, prod_model)
+
+            self.log_writer.log(
+                f"Got predictions for {len(result)} records", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return prod_model_name, [float(pred) for pred in result]
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,201 @@
+import asyncio
+
+from utils.logger import App_Logger
+from utils.metrics import App_Metrics
+from utils.read_params import get_log_dic, read_params
+
+
+class Prediction_Batcher:
+    """
+    Description :   This class coalesces concurrent online prediction requests into micro batches, so that the prod
+                    model is called once per batch instead of once per request
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, prediction):
+        self.config = read_params()
+
+        self.prediction = prediction
+
+        self.log_writer = App_Logger()
+
+        self.metrics = App_Metrics()
+
+        self.batcher_log = self.config["log"]["prediction_batcher"]
+
+        self.max_records = self.config["online_prediction"]["max_records"]
+
+        self.max_batch_size = self.config["online_prediction"]["max_batch_size"]
+
+        self.max_wait = self.config["online_prediction"]["max_wait_ms"] / 1000
+
+        self.queue = None
+
+        self.worker = None
+
+    async def start(self):
+        """
+        Method Name :   start
+        Description :   This method starts the batching worker on the running event loop
+
+        Output      :   Batching worker is started
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.queue = asyncio.Queue()
+
+        self.worker = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """
+        Method Name :   stop
+        Description :   This method stops the batching worker
+
+        Output      :   Batching worker is stopped
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+
+            self.worker = None
+
+    async def predict(self, records):
+        """
+        Method Name :   predict
+        Description :   This method queues the records of one request and waits for the predictions of its micro batch
+
+        Output      :   A tuple of the name of the prod model which scored the micro batch and a list of
+                        predictions in the same order as records is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if isinstance(records, dict):
+            records = [records]
+
+        if not isinstance(records, list) or len(records) == 0:
+            raise ValueError("Expected a shipment record or a list of records")
+
+        if len(records) > self.max_records:
+            raise ValueError(
+                f"Got {len(records)} records, at most {self.max_records} records are allowed"
+            )
+
+        if self.worker is None:
+            await self.start()
+
+        future = asyncio.get_event_loop().create_future()
+
+        await self.queue.put((records, future))
+
+        return await future
+
+    async def get_batch(self):
+        """
+        Method Name :   get_batch
+        Description :   This method waits for a request and then gathers more requests until max_wait_ms has passed
+                        or max_batch_size records are collected
+
+        Output      :   A list of tuple of records and future is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        loop = asyncio.get_event_loop()
+
+        batch = [await self.queue.get()]
+
+        n_records = len(batch[0][0])
+
+        deadline = loop.time() + self.max_wait
+
+        while n_records < self.max_batch_size:
+            timeout = deadline - loop.time()
+
+            if timeout <= 0:
+                break
+
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+
+            except asyncio.TimeoutError:
+                break
+
+            batch.append(item)
+
+            n_records += len(item[0])
+
+        return batch
+
+    async def run(self):
+        """
+        Method Name :   run
+        Description :   This method runs one prediction per micro batch in a worker thread and fans the predictions
+                        back to the waiting requests. If the batch fails, the requests are retried one by one so that
+                        an invalid request does not fail the others
+
+        Output      :   Predictions are set on the futures of the waiting requests
+        On Failure  :   Exception is set on the future of the failed request
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.run.__name__, __file__, self.batcher_log
+        )
+
+        loop = asyncio.get_event_loop()
+
+        while True:
+            batch = await self.get_batch()
+
+            records = [record for recs, _ in batch for record in recs]
+
+            try:
+                model_name, preds = await loop.run_in_executor(
+                    None, self.prediction.predict_from_records, records, False
+                )
+
+                self.metrics.stage_rows.inc(len(records), stage="online_prediction")
+
+                self.log_writer.log(
+                    f"Predicted {len(records)} records from {len(batch)} requests in one batch",
+                    **log_dic,
+                )
+
+                start = 0
+
+                for recs, future in batch:
+                    if not future.done():
+                        future.set_result(
+                            (model_name, preds[start : start + len(recs)])
+                        )
+
+                    start += len(recs)
+
+            except Exception:
+                for recs, future in batch:
+                    try:
+                        result = await loop.run_in_executor(
+                            None, self.prediction.predict_from_records, recs, False
+                        )
+
+                        self.metrics.stage_rows.inc(
+                            len(recs), stage="online_prediction"
+                        )
+
+                        if not future.done():
+                            future.set_result(result)
+
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
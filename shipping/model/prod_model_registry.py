@@ -0,0 +1,205 @@
+from logging import WARNING
+from os.path import basename, getmtime
+from threading import Lock
+from time import monotonic, perf_counter
+
+from utils.logger import App_Logger
+from utils.metrics import App_Metrics
+from utils.model_utils import Model_Utils
+from utils.preprocess_utils import Preprocess_Utils
+from utils.read_params import get_log_dic, read_params
+
+
+class Prod_Model_Registry:
+    """
+    Description :   This class keeps the production model and fitted preprocessor resident in memory and swaps
+                    them when a new model is pushed to production
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.log_writer = App_Logger()
+
+        self.model_utils = Model_Utils()
+
+        self.metrics = App_Metrics()
+
+        self.registry_log = self.config["log"]["prod_model_registry"]
+
+        self.preprocessor_name = self.config["preprocessor_name"]
+
+        self.preprocess_utils = Preprocess_Utils(self.registry_log)
+
+        self.check_interval = self.config["model_registry"]["check_interval"]
+
+        self.lock = Lock()
+
+        self.entry = None
+
+        self.last_check = None
+
+    def get_version(self):
+        """
+        Method Name :   get_version
+        Description :   This method gets the version of the model in production based on the model file name and
+                        mtime, the model and preprocessor files are the pair named by the prod manifest
+
+        Output      :   A tuple of prod model file, prod preprocessor file and version is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_version.__name__,
+            __file__,
+            self.registry_log,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            prod_model_file, prod_preprocessor_file = self.model_utils.get_prod_files(
+                self.registry_log
+            )
+
+            version = (
+                prod_model_file,
+                getmtime(prod_model_file),
+                getmtime(prod_preprocessor_file),
+            )
+
+            self.log_writer.log(f"Got {version} as prod model version", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return prod_model_file, prod_preprocessor_file, version
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def reload(self, force=False):
+        """
+        Method Name :   reload
+        Description :   This method loads the prod model and preprocessor if the version in production has changed,
+                        the lookups of the fitted encoders are precomputed for online requests and the resident
+                        entry is swapped atomically so that requests in flight keep their model. The load time and
+                        the new version are recorded in the metrics
+
+        Output      :   The resident model entry is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.reload.__name__, __file__, self.registry_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            with self.lock:
+                self.last_check = monotonic()
+
+                (
+                    prod_model_file,
+                    prod_preprocessor_file,
+                    version,
+                ) = self.get_version()
+
+                if force or self.entry is None or self.entry["version"] != version:
+                    start = perf_counter()
+
+                    model = self.model_utils.load_model(
+                        prod_model_file, self.registry_log
+                    )
+
+                    preprocessor = self.model_utils.load_model(
+                        prod_preprocessor_file, self.registry_log
+                    )
+
+                    preprocessor["one_hot_lookup"] = self.preprocess_utils.get_lookup(
+                        preprocessor["one_hot_encoder"]
+                    )
+
+                    preprocessor["ordinal_lookup"] = self.preprocess_utils.get_lookup(
+                        preprocessor["ordinal_encoder"]
+                    )
+
+                    self.metrics.model_load_seconds.observe(perf_counter() - start)
+
+                    self.entry = {
+                        "version": version,
+                        "model_name": model.__class__.__name__,
+                        "model": model,
+                        "preprocessor": preprocessor,
+                    }
+
+                    self.metrics.prod_model.replace(
+                        version[1],
+                        model_name=self.entry["model_name"],
+                        model_file=basename(prod_model_file),
+                    )
+
+                    self.log_writer.log(
+                        f"Loaded {prod_model_file} model as resident prod model",
+                        **log_dic,
+                    )
+
+                else:
+                    self.log_writer.log(
+                        "Prod model has not changed, skipped reloading", **log_dic
+                    )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return self.entry
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_model(self):
+        """
+        Method Name :   get_model
+        Description :   This method gets the resident prod model entry, the prod model folder is checked for a new
+                        version at most once every check_interval seconds. A failed reload is logged and the
+                        resident entry is kept serving until the next check
+
+        Output      :   A dict of version, model name, model and fitted preprocessor is returned
+        On Failure  :   Raise an exception if there is no resident entry
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if (
+            self.entry is None
+            or self.last_check is None
+            or monotonic() - self.last_check > self.check_interval
+        ):
+            try:
+                return self.reload()
+
+            except Exception as e:
+                if self.entry is None:
+                    raise e
+
+                log_dic = get_log_dic(
+                    self.__class__.__name__,
+                    self.get_model.__name__,
+                    __file__,
+                    self.registry_log,
+                )
+
+                self.log_writer.log(
+                    f"Failed to reload prod model, serving resident {self.entry['model_name']} model : {e}",
+                    **log_dic,
+                    level=WARNING,
+                )
+
+        return self.entry
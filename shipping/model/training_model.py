@@ -2,7 +2,9 @@ from shipping.data_ingestion.data_loader_train import Data_Getter_Train
 from shipping.data_preprocessing.preprocessing import Preprocessor
 from shipping.model_finder.tuner import Model_Finder
 from utils.logger import App_Logger
+from utils.metrics import App_Metrics
 from utils.read_params import get_log_dic, read_params
+from utils.run_report import Run_Report
 
 
 class Train_Model:
@@ -15,19 +17,22 @@ class Train_Model:
 
         self.log_writer = App_Logger()
 
+        self.metrics = App_Metrics()
+
         self.data_getter_train = Data_Getter_Train(self.model_train_log)
 
         self.preprocessor = Preprocessor(self.model_train_log)
 
         self.tuner = Model_Finder(self.model_train_log)
 
-    def training_model(self):
+    def training_model(self, run_report=None):
         """
         Method Name :   training_model
         Description :   This method is responsible for applying the preprocessing functions and then train models againist 
                         training data 
         
-        Output      :   Models are trained and saved in respective folders
+        Output      :   Models are trained and saved in respective folders, the stages are recorded in run_report
+                        and a run report is saved if run_report is not given
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -42,33 +47,64 @@ class Train_Model:
 
         self.log_writer.start_log("start", **log_dic)
 
+        report = run_report or Run_Report("train")
+
         try:
             self.log_writer.log("Started model training", **log_dic)
 
-            data = self.data_getter_train.get_data()
+            with report.stage("data_load") as stage:
+                data = self.data_getter_train.get_data()
+
+                stage["rows_out"] = len(data)
+
+            with report.stage("preprocessing") as stage:
+                stage["rows_in"] = len(data)
+
+                data = self.preprocessor.apply_one_hot_encoding(data)
+
+                data = self.preprocessor.apply_ordinal_encoding(data)
 
-            data = self.preprocessor.apply_one_hot_encoding(data)
+                data = self.preprocessor.remove_columns(data)
 
-            data = self.preprocessor.apply_ordinal_encoding(data)
+                X, Y = self.preprocessor.separate_label_feature(data, self.target_col)
 
-            data = self.preprocessor.remove_columns(data)
+                self.preprocessor.is_null_present(X)
 
-            is_null_present = self.preprocessor.is_null_present(data)
+                X = self.preprocessor.impute_missing_values(X)
 
-            if is_null_present:
-                data = self.preprocessor.impute_missing_values(data)
+                X = self.preprocessor.apply_standard_scaler(X)
 
-            X, Y = self.preprocessor.separate_label_feature(data, self.target_col)
+                stage["rows_out"] = len(X)
 
-            X = self.preprocessor.apply_standard_scaler(X)
+            self.metrics.stage_rows.inc(len(X), stage="model_training")
 
-            lst = self.tuner.train_and_save_models(X, Y)
+            with report.stage("model_finder") as stage:
+                stage["rows_in"] = len(X)
+
+                lst = self.tuner.train_and_save_models(X, Y)
+
+                model_timings = self.tuner.model_utils.model_timings
+
+                for key in ["search_time", "refit_time", "predict_time"]:
+                    stage[key] = {
+                        model_name: round(timings[key], 3)
+                        for model_name, timings in model_timings.items()
+                    }
+
+            with report.stage("save_preprocessor"):
+                self.preprocessor.save_preprocessor()
 
             self.log_writer.log("Finished model training", **log_dic)
 
+            if run_report is None:
+                report.save()
+
             self.log_writer.start_log("exit", **log_dic)
 
             return lst
 
         except Exception as e:
+            if run_report is None:
+                report.save("failed")
+
             self.log_writer.exception_log(e, **log_dic)
@@ -21,6 +21,8 @@ class Model_Finder:
 
         self.split_kwargs = self.config["base"]
 
+        self.parallel_search = self.config["model_search"]["parallel"]
+
         self.model_utils = Model_Utils()
 
         self.utils = Main_Utils()
@@ -30,7 +32,8 @@ class Model_Finder:
     def get_trained_models(self, X_data, Y_data):
         """
         Method Name :   get_trained_models
-        Description :   This methods gets the trained models based on training data
+        Description :   This methods gets the trained models based on training data, the models are tuned
+                        together as one pool of search tasks if parallel model search is enabled
         
         Output      :   A list of tuple of model and model score are returned
         On Failure  :   Write an exception log and then raise an exception
@@ -54,19 +57,30 @@ class Model_Finder:
                 X_data, Y_data, **self.split_kwargs
             )
 
-            lst = [
-                (
-                    self.model_utils.get_tuned_model(
-                        model_name,
-                        x_train,
-                        y_train,
-                        x_test,
-                        y_test,
-                        log_dic["log_file"],
-                    )
+            if self.parallel_search:
+                lst = self.model_utils.get_tuned_models(
+                    models_lst, x_train, y_train, x_test, y_test, log_dic["log_file"]
                 )
-                for model_name in models_lst
-            ]
+
+            else:
+                lst = [
+                    (
+                        self.model_utils.get_tuned_model(
+                            model_name,
+                            x_train,
+                            y_train,
+                            x_test,
+                            y_test,
+                            log_dic["log_file"],
+                        )
+                    )
+                    for model_name in models_lst
+                ]
+
+            self.log_writer.log(
+                f"Got search, refit and predict timings of models as {self.model_utils.model_timings}",
+                **log_dic,
+            )
 
             return lst
 
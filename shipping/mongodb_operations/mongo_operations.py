@@ -1,14 +1,16 @@
-from json import loads
+from datetime import datetime
+from itertools import islice
 from os import environ
 
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import BulkWriteError
 
-from utils.logger import App_Logger
-from utils.read_params import get_log_dic, read_params
+from shipping.storage_operations.storage_operation import Storage_Operation
+from utils.read_params import get_log_dic
 
 
-class MongoDB_Operation:
+class MongoDB_Operation(Storage_Operation):
     """
     Description :   This method is used for all mongodb operations
     Written by  :   iNeuron Intelligence
@@ -18,13 +20,25 @@ class MongoDB_Operation:
     """
 
     def __init__(self):
-        self.config = read_params()
+        super().__init__()
 
         self.DB_URL = environ["MONGODB_URL"]
 
         self.client = MongoClient(self.DB_URL)
 
-        self.log_writer = App_Logger()
+        self.insert_chunk_size = self.config["mongodb"]["insert_chunk_size"]
+
+        self.export_chunk_size = self.config["mongodb"].get(
+            "export_chunk_size", self.config["storage"]["export_chunk_size"]
+        )
+
+        self.manifest_suffix = self.config["mongodb"]["manifest_suffix"]
+
+        self.source_cols = ["source_file", "source_hash", "source_row"]
+
+        self.collections = {}
+
+        self.indexed_collections = set()
 
     def get_database(self, db_name, log_file):
         """
@@ -86,6 +100,59 @@ class MongoDB_Operation:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def get_collection_as_dataframes(
+        self, db_name, collection_name, log_file, query=None
+    ):
+        """
+        Method Name :   get_collection_as_dataframes
+        Description :   This method reads the documents of the selected collection matching the query in chunks of
+                        export_chunk_size documents, _id and the source columns are excluded by the projection so
+                        that they are not sent by the server
+
+        Output      :   A generator of dataframes of the collection is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_collection_as_dataframes.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            database = self.get_database(db_name, log_file)
+
+            collection = database.get_collection(name=collection_name)
+
+            projection = {c: 0 for c in ["_id"] + self.source_cols}
+
+            cursor = collection.find(
+                query or {}, projection, batch_size=self.export_chunk_size
+            )
+
+            chunks = iter(lambda: list(islice(cursor, self.export_chunk_size)), [])
+
+            n_chunks = 0
+
+            for chunk in chunks:
+                n_chunks += 1
+
+                yield pd.DataFrame(chunk)
+
+            self.log_writer.log(
+                f"Read collection as {n_chunks} dataframe chunks", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def get_collection_as_dataframe(self, db_name, collection_name, log_file):
         """
         Method Name :   get_collection_as_dataframe
@@ -108,32 +175,170 @@ class MongoDB_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            database = self.get_database(db_name, log_file)
-
-            collection = database.get_collection(name=collection_name)
-
-            df = pd.DataFrame(list(collection.find()))
+            dfs = list(
+                self.get_collection_as_dataframes(db_name, collection_name, log_file)
+            )
 
-            if "_id" in df.columns.to_list():
-                df = df.drop(columns=["_id"], axis=1)
+            df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
 
             self.log_writer.log("Converted collection to dataframe", **log_dic)
 
-            self.log_writer.start_log("exit", *log_dic)
+            self.log_writer.start_log("exit", **log_dic)
 
             return df
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def export_collection_to_file(
+        self,
+        db_name,
+        collection_name,
+        export_file,
+        log_file,
+        col_types=None,
+        incremental=False,
+    ):
+        """
+        Method Name :   export_collection_to_file
+        Description :   This method exports the selected collection to csv file or parquet folder chunk by chunk, so
+                        that the collection is never loaded in memory at once. The file format is based on the file
+                        extension, col_types are the schema dtypes of the parquet file. If incremental is set and the
+                        export file exists, only the source files not yet exported as per the manifest are appended
+
+        Output      :   The collection is written to export file and number of exported records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.export_collection_to_file.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            manifest = self.get_insert_collection(
+                db_name, collection_name + self.manifest_suffix, log_file
+            )
+
+            append_columns = self.get_append_columns(export_file, incremental)
+
+            query = None
+
+            if append_columns is not None:
+                source_hashes = manifest.distinct(
+                    "source_hash", {"exported": {"$ne": True}}
+                )
+
+                query = {"source_hash": {"$in": source_hashes}}
+
+                self.log_writer.log(
+                    f"Appending {len(source_hashes)} source files not yet exported to {export_file} file",
+                    **log_dic,
+                )
+
+            else:
+                source_hashes = manifest.distinct("source_hash")
+
+            n_records = self.write_dataframes_to_file(
+                self.get_collection_as_dataframes(
+                    db_name, collection_name, log_file, query
+                ),
+                export_file,
+                append_columns,
+                col_types,
+            )
+
+            manifest.update_many(
+                {"source_hash": {"$in": source_hashes}}, {"$set": {"exported": True}}
+            )
+
+            self.log_writer.log(
+                f"Exported {n_records} records to {export_file} file", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return n_records
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_insert_collection(self, db_name, collection_name, log_file):
+        """
+        Method Name :   get_insert_collection
+        Description :   This method gets the collection for inserting records, the collection is fetched once
+                        and reused for the next inserts
+
+        Output      :   A collection is returned from the selected db_name and collection_name
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = (db_name, collection_name)
+
+        if key not in self.collections:
+            database = self.get_database(db_name, log_file)
+
+            self.collections[key] = self.get_collection(
+                database, collection_name, log_file
+            )
+
+        return self.collections[key]
+
+    def create_source_index(self, collection, manifest):
+        """
+        Method Name :   create_source_index
+        Description :   This method creates the unique index on source hash and source row of the collection and on
+                        source hash of the manifest, the indexes are created once per collection
+
+        Output      :   Unique indexes are created
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if collection.full_name not in self.indexed_collections:
+            collection.create_index(
+                [("source_hash", ASCENDING), ("source_row", ASCENDING)], unique=True
+            )
+
+            manifest.create_index([("source_hash", ASCENDING)], unique=True)
+
+            self.indexed_collections.add(collection.full_name)
+
+    def get_dataframe_as_records(self, data_frame):
+        """
+        Method Name :   get_dataframe_as_records
+        Description :   This method converts the dataframe to a list of documents, missing values are stored as None
+
+        Output      :   A list of dict of records is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        data_frame = data_frame.astype(object)
+
+        return data_frame.where(data_frame.notna(), None).to_dict("records")
+
     def insert_dataframe_as_record(
-        self, data_frame, db_name, collection_name, log_file
+        self, data_frame, db_name, collection_name, log_file, source_file=None
     ):
         """
         Method Name :   insert_dataframe_as_record
-        Description :   This method inserts the dataframe as record in database collection
+        Description :   This method inserts the dataframe as record in database collection, the dataframe is
+                        converted and inserted in chunks of insert_chunk_size rows. Each record is tagged with the
+                        source file, content hash and row number, and the dataframe is skipped if the manifest
+                        shows it is already loaded. Records of a partly loaded dataframe are not inserted twice
 
-        Output      :   The dataframe is inserted in database collection
+        Output      :   The dataframe is inserted in database collection and number of inserted records is returned
         On Failure  :   Write an exception log and then raise an exception
 
         Version     :   1.2
@@ -149,21 +354,73 @@ class MongoDB_Operation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            records = loads(data_frame.T.to_json()).values()
+            collection = self.get_insert_collection(db_name, collection_name, log_file)
 
-            self.log_writer.log(f"Converted dataframe to json records", **log_dic)
+            manifest = self.get_insert_collection(
+                db_name, collection_name + self.manifest_suffix, log_file
+            )
 
-            database = self.get_database(db_name, log_file)
+            self.create_source_index(collection, manifest)
 
-            collection = database.get_collection(collection_name)
+            source_hash = self.get_dataframe_hash(data_frame)
+
+            if manifest.find_one({"source_hash": source_hash, "status": "loaded"}):
+                self.log_writer.log(
+                    f"{source_file} source file is already loaded, skipped inserting it",
+                    **log_dic,
+                )
+
+                self.log_writer.start_log("exit", **log_dic)
+
+                return 0
 
             self.log_writer.log("Inserting records to MongoDB", **log_dic)
 
-            collection.insert_many(records)
+            n_records = 0
+
+            for start in range(0, len(data_frame), self.insert_chunk_size):
+                records = self.get_dataframe_as_records(
+                    data_frame.iloc[start : start + self.insert_chunk_size]
+                )
+
+                for i, record in enumerate(records, start):
+                    record.update(
+                        source_file=source_file, source_hash=source_hash, source_row=i
+                    )
+
+                try:
+                    n_records += len(
+                        collection.insert_many(records, ordered=False).inserted_ids
+                    )
+
+                except BulkWriteError as e:
+                    if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                        raise e
+
+                    n_records += e.details["nInserted"]
+
+            manifest.update_one(
+                {"source_hash": source_hash},
+                {
+                    "$set": {
+                        "source_file": source_file,
+                        "n_records": len(data_frame),
+                        "status": "loaded",
+                        "exported": False,
+                        "loaded_at": datetime.now(),
+                    }
+                },
+                upsert=True,
+            )
 
-            self.log_writer.log("Inserted records to MongoDB", **log_dic)
+            self.log_writer.log(
+                f"Inserted {n_records} records of {source_file} source file to MongoDB",
+                **log_dic,
+            )
 
             self.log_writer.start_log("exit", **log_dic)
 
+            return n_records
+
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -2,8 +2,11 @@ from os import listdir
 from re import match, split
 from shutil import copy, move
 
-from pandas import read_csv
-
+from utils.batch_utils import (
+    Batch_Utils,
+    check_col_length,
+    check_missing_values_in_col,
+)
 from utils.logger import App_Logger
 from utils.main_utils import Main_Utils
 from utils.read_params import get_log_dic, read_params
@@ -25,6 +28,8 @@ class Raw_Train_Data_Validation:
 
         self.utils = Main_Utils()
 
+        self.batch_utils = Batch_Utils()
+
         self.raw_train_data_dir = self.config["data"]["raw_data"]["train_batch"]
 
         self.good_train_data_dir = self.config["data"]["train"]["good_data_dir"]
@@ -43,6 +48,8 @@ class Raw_Train_Data_Validation:
 
         self.train_col_valid_log = self.config["log"]["train_col_validation"]
 
+        self.n_sample_rows = self.config["col_validation"]["n_sample_rows"]
+
         self.train_missing_value_log = self.config["log"]["train_missing_values_in_col"]
 
     def values_from_schema(self):
@@ -196,10 +203,12 @@ class Raw_Train_Data_Validation:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def validate_col_length(self, NumberofColumns):
+    def validate_col_length(self, NumberofColumns, column_names=None):
         """
         Method Name :   validate_col_length
-        Description :   This method validates the column length based on number of columns as mentioned in schema values
+        Description :   This method validates the column length based on number of columns as mentioned in schema values,
+                        only the header and a few sample rows of each file are read. The header is also checked 
+                        against the column names from schema values
 
         Output      :   The files' columns length are validated and good data is stored in good data folder and rest is stored in bad data folder
         On Failure  :   Write an exception log and then raise an exception
@@ -217,19 +226,27 @@ class Raw_Train_Data_Validation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            for file in listdir(self.good_train_data_dir):
-                fname = self.good_train_data_dir + "/" + file
+            files = sorted(
+                f for f in listdir(self.good_train_data_dir) if f.endswith(".csv")
+            )
 
-                csv = read_csv(fname)
+            fnames = [self.good_train_data_dir + "/" + file for file in files]
 
-                if csv.shape[1] == NumberofColumns:
-                    pass
+            results = self.batch_utils.run_batch(
+                check_col_length,
+                [
+                    (fname, NumberofColumns, column_names, self.n_sample_rows)
+                    for fname in fnames
+                ],
+                self.train_col_valid_log,
+            )
 
-                else:
+            for file, fname, is_valid in zip(files, fnames, results):
+                if not is_valid:
                     move(fname, self.bad_train_data_dir)
 
                     self.log_writer.log(
-                        f"Invalid Column Length for the {file} file File moved to Bad Raw Folder",
+                        f"Invalid Column Length or Column Names for the {file} file File moved to Bad Raw Folder",
                         **log_dic,
                     )
 
@@ -259,30 +276,26 @@ class Raw_Train_Data_Validation:
         self.log_writer.start_log("start", **log_dic)
 
         try:
-            for file in listdir(self.good_train_data_dir):
-                fname = self.good_train_data_dir + "/" + file
-
-                csv = read_csv(fname)
-
-                count = 0
-
-                for columns in csv:
-                    if (len(csv[columns]) - csv[columns].count()) == len(csv[columns]):
-                        count += 1
-
-                        move(fname, self.bad_train_data_dir)
+            files = sorted(
+                f for f in listdir(self.good_train_data_dir) if f.endswith(".csv")
+            )
 
-                        self.log_writer.log(
-                            "Invalid Column Length for the {file} file,File moved to Bad Raw Folder",
-                            **log_dic,
-                        )
+            fnames = [self.good_train_data_dir + "/" + file for file in files]
 
-                        break
+            results = self.batch_utils.run_batch(
+                check_missing_values_in_col,
+                [(fname,) for fname in fnames],
+                self.train_missing_value_log,
+            )
 
-                if count == 0:
-                    good_data_fname = self.good_train_data_dir + "/" + file
+            for file, fname, is_valid in zip(files, fnames, results):
+                if not is_valid:
+                    move(fname, self.bad_train_data_dir)
 
-                    csv.to_csv(good_data_fname, index=None, header=True)
+                    self.log_writer.log(
+                        f"Invalid Column Length for the {file} file,File moved to Bad Raw Folder",
+                        **log_dic,
+                    )
 
             self.log_writer.start_log("exit", **log_dic)
 
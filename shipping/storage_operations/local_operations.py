@@ -0,0 +1,251 @@
+from datetime import datetime
+from json import dump, load
+from os import makedirs, replace
+from os.path import isfile, join
+from threading import Lock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from shipping.storage_operations.storage_operation import Storage_Operation
+from utils.read_params import get_log_dic
+
+
+class Local_Operation(Storage_Operation):
+    """
+    Description :   This class stores the good data as parquet files in a local folder, one parquet file per source
+                    file, so that the pipeline can run without a MongoDB server
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.local_dir = self.config["storage"]["local_dir"]
+
+        self.export_chunk_size = self.config["storage"]["export_chunk_size"]
+
+        self.manifest_lock = Lock()
+
+    def get_collection_dir(self, db_name, collection_name):
+        """
+        Method Name :   get_collection_dir
+        Description :   This method gets the folder of the collection and creates it if not present
+
+        Output      :   The collection folder is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        collection_dir = join(self.local_dir, db_name, collection_name)
+
+        makedirs(collection_dir, exist_ok=True)
+
+        return collection_dir
+
+    def read_manifest(self, collection_dir):
+        """
+        Method Name :   read_manifest
+        Description :   This method reads the manifest of loaded source files of the collection
+
+        Output      :   A dict of source hash and source file details is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        manifest_file = join(collection_dir, "manifest.json")
+
+        if not isfile(manifest_file):
+            return {}
+
+        with open(manifest_file) as f:
+            return load(f)
+
+    def write_manifest(self, collection_dir, manifest):
+        """
+        Method Name :   write_manifest
+        Description :   This method writes the manifest of loaded source files of the collection, the manifest is
+                        written to a temp file first so that it is never left half written
+
+        Output      :   Manifest is written to the collection folder
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        manifest_file = join(collection_dir, "manifest.json")
+
+        with open(manifest_file + ".tmp", "w") as f:
+            dump(manifest, f, indent=2)
+
+        replace(manifest_file + ".tmp", manifest_file)
+
+    def insert_dataframe_as_record(
+        self, data_frame, db_name, collection_name, log_file, source_file=None
+    ):
+        """
+        Method Name :   insert_dataframe_as_record
+        Description :   This method writes the dataframe as parquet file of its content hash in the collection
+                        folder, the dataframe is skipped if the manifest shows it is already loaded
+
+        Output      :   Number of inserted records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.insert_dataframe_as_record.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            collection_dir = self.get_collection_dir(db_name, collection_name)
+
+            source_hash = self.get_dataframe_hash(data_frame)
+
+            with self.manifest_lock:
+                is_loaded = source_hash in self.read_manifest(collection_dir)
+
+            if is_loaded:
+                self.log_writer.log(
+                    f"{source_file} source file is already loaded, skipped inserting it",
+                    **log_dic,
+                )
+
+                self.log_writer.start_log("exit", **log_dic)
+
+                return 0
+
+            data_file = join(collection_dir, source_hash + ".parquet")
+
+            table = pa.Table.from_pandas(data_frame, preserve_index=False)
+
+            pq.write_table(table, data_file + ".tmp")
+
+            replace(data_file + ".tmp", data_file)
+
+            with self.manifest_lock:
+                manifest = self.read_manifest(collection_dir)
+
+                manifest[source_hash] = {
+                    "source_file": source_file,
+                    "n_records": len(data_frame),
+                    "status": "loaded",
+                    "exported": False,
+                    "loaded_at": datetime.now().isoformat(),
+                }
+
+                self.write_manifest(collection_dir, manifest)
+
+            self.log_writer.log(
+                f"Inserted {len(data_frame)} records of {source_file} source file to {data_file} file",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return len(data_frame)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_collection_as_dataframes(self, collection_dir, source_hashes):
+        """
+        Method Name :   get_collection_as_dataframes
+        Description :   This method reads the parquet files of the source hashes in chunks of export_chunk_size rows
+
+        Output      :   A generator of dataframes of the collection is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        for source_hash in source_hashes:
+            data_file = pq.ParquetFile(join(collection_dir, source_hash + ".parquet"))
+
+            for batch in data_file.iter_batches(batch_size=self.export_chunk_size):
+                yield batch.to_pandas()
+
+    def export_collection_to_file(
+        self,
+        db_name,
+        collection_name,
+        export_file,
+        log_file,
+        col_types=None,
+        incremental=False,
+    ):
+        """
+        Method Name :   export_collection_to_file
+        Description :   This method exports the parquet files of the collection to csv file or parquet folder chunk
+                        by chunk. If incremental is set and the export file exists, only the source files not yet
+                        exported as per the manifest are appended to it
+
+        Output      :   The collection is written to export file and number of exported records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.export_collection_to_file.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            collection_dir = self.get_collection_dir(db_name, collection_name)
+
+            with self.manifest_lock:
+                manifest = self.read_manifest(collection_dir)
+
+            append_columns = self.get_append_columns(export_file, incremental)
+
+            if append_columns is not None:
+                source_hashes = [h for h, m in manifest.items() if not m["exported"]]
+
+                self.log_writer.log(
+                    f"Appending {len(source_hashes)} source files not yet exported to {export_file} file",
+                    **log_dic,
+                )
+
+            else:
+                source_hashes = list(manifest)
+
+            n_records = self.write_dataframes_to_file(
+                self.get_collection_as_dataframes(collection_dir, source_hashes),
+                export_file,
+                append_columns,
+                col_types,
+            )
+
+            with self.manifest_lock:
+                manifest = self.read_manifest(collection_dir)
+
+                for source_hash in source_hashes:
+                    manifest[source_hash]["exported"] = True
+
+                self.write_manifest(collection_dir, manifest)
+
+            self.log_writer.log(
+                f"Exported {n_records} records to {export_file} file", **log_dic
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return n_records
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,295 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from csv import reader
+from glob import glob
+from hashlib import sha256
+from os import makedirs, remove
+from os.path import basename, isdir, isfile, join, splitext
+from shutil import rmtree
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.util import hash_pandas_object
+
+from utils.logger import App_Logger
+from utils.main_utils import Main_Utils
+from utils.metrics import App_Metrics
+from utils.read_params import get_log_dic, read_params
+
+
+class Storage_Operation(ABC):
+    """
+    Description :   This class is the interface for the storage of good data, the storage backend is selected by
+                    storage backend key in params.yaml. A backend has to implement insert_dataframe_as_record and
+                    export_collection_to_file to be created
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.insert_workers = self.config["storage"]["insert_workers"]
+
+        self.utils = Main_Utils()
+
+        self.log_writer = App_Logger()
+
+        self.metrics = App_Metrics()
+
+    def get_dataframe_hash(self, data_frame):
+        """
+        Method Name :   get_dataframe_hash
+        Description :   This method gets the content hash of the dataframe from its columns and values
+
+        Output      :   A sha256 hex digest of the dataframe is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        h = sha256(",".join(map(str, data_frame.columns)).encode())
+
+        h.update(hash_pandas_object(data_frame, index=False).values.tobytes())
+
+        return h.hexdigest()
+
+    def get_append_columns(self, export_file, incremental):
+        """
+        Method Name :   get_append_columns
+        Description :   This method gets the columns of the export file if new records can be appended to it, which
+                        is the case for an incremental export to an existing csv file or parquet folder
+
+        Output      :   A list of columns of the export file is returned, None if the file has to be written again
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if not incremental:
+            return None
+
+        if splitext(export_file)[1] == ".parquet":
+            parts = sorted(glob(join(export_file, "part-*.parquet")))
+
+            return pq.read_schema(parts[0]).names if parts else None
+
+        if not isfile(export_file):
+            return None
+
+        with open(export_file, newline="") as f:
+            return next(reader(f), None)
+
+    def write_dataframes_to_file(
+        self, data_frames, export_file, append_columns=None, col_types=None
+    ):
+        """
+        Method Name :   write_dataframes_to_file
+        Description :   This method writes the dataframes to csv file or parquet folder one by one, the file format is
+                        based on the file extension. The dataframes are appended if append_columns is given, a parquet
+                        export is a folder of part files so that new part files can be appended to it. Parquet
+                        files are written with the schema dtypes of col_types (ColName of schema file)
+
+        Output      :   Number of written records is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        is_parquet = splitext(export_file)[1] == ".parquet"
+
+        append = append_columns is not None
+
+        columns, schema, writer, n_records = append_columns, None, None, 0
+
+        if is_parquet:
+            if append:
+                parts = sorted(glob(join(export_file, "part-*.parquet")))
+
+                schema = pq.read_schema(parts[0])
+
+            else:
+                parts = []
+
+                if isdir(export_file):
+                    rmtree(export_file)
+
+                elif isfile(export_file):
+                    remove(export_file)
+
+                makedirs(export_file)
+
+            part_file = join(export_file, f"part-{len(parts):05d}.parquet")
+
+        for df in data_frames:
+            if columns is None:
+                columns = df.columns.to_list()
+
+            df = df.reindex(columns=columns)
+
+            if is_parquet:
+                if schema is None:
+                    schema = self.utils.get_arrow_schema(df, col_types)
+
+                table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+                if writer is None:
+                    writer = pq.ParquetWriter(part_file, schema)
+
+                writer.write_table(table)
+
+            else:
+                df.to_csv(
+                    export_file,
+                    index=None,
+                    header=n_records == 0 and not append,
+                    mode="w" if n_records == 0 and not append else "a",
+                )
+
+            n_records += len(df)
+
+        if writer is not None:
+            writer.close()
+
+        if columns is None and not is_parquet:
+            pd.DataFrame().to_csv(export_file, index=None)
+
+        self.metrics.stage_rows.inc(n_records, stage="db_export")
+
+        return n_records
+
+    @abstractmethod
+    def insert_dataframe_as_record(
+        self, data_frame, db_name, collection_name, log_file, source_file=None
+    ):
+        """
+        Method Name :   insert_dataframe_as_record
+        Description :   This method inserts the dataframe of the source file in the collection, a source file which
+                        is already loaded is skipped
+
+        Output      :   Number of inserted records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_collection_to_file(
+        self,
+        db_name,
+        collection_name,
+        export_file,
+        log_file,
+        col_types=None,
+        incremental=False,
+    ):
+        """
+        Method Name :   export_collection_to_file
+        Description :   This method exports the collection to csv file or parquet folder based on the file extension
+
+        Output      :   Number of exported records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        raise NotImplementedError
+
+    def insert_file_as_record(self, data_file, db_name, collection_name, log_file):
+        """
+        Method Name :   insert_file_as_record
+        Description :   This method reads the csv, parquet or feather data file and inserts it as record in the
+                        collection, with the file name as source file
+
+        Output      :   Number of inserted records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        data_frame = self.utils.read_frame(data_file, log_file)
+
+        return self.insert_dataframe_as_record(
+            data_frame, db_name, collection_name, log_file, basename(data_file)
+        )
+
+    def insert_files_as_record(self, data_files, db_name, collection_name, log_file):
+        """
+        Method Name :   insert_files_as_record
+        Description :   This method inserts a list of data files as record in the collection, upto insert_workers
+                        files are read and inserted at the same time so that only those dataframes are in memory
+
+        Output      :   The data files are inserted in the collection and number of inserted records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.insert_files_as_record.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            n_workers = max(1, min(self.insert_workers, len(data_files)))
+
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                n_records = list(
+                    executor.map(
+                        lambda f: self.insert_file_as_record(
+                            f, db_name, collection_name, log_file
+                        ),
+                        data_files,
+                    )
+                )
+
+            self.metrics.stage_rows.inc(sum(n_records), stage="db_insert")
+
+            self.log_writer.log(
+                f"Inserted {sum(n_records)} records from {len(data_files)} files with {n_workers} workers",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return sum(n_records)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+
+def get_storage_operation():
+    """
+    Method Name :   get_storage_operation
+    Description :   This method gets the storage operation of the backend selected in params.yaml, the backend
+                    module is imported only when selected so that mongodb is not required for the local backend
+
+    Output      :   A storage operation object is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    backend = read_params()["storage"]["backend"]
+
+    if backend == "mongodb":
+        from shipping.mongodb_operations.mongo_operations import MongoDB_Operation
+
+        return MongoDB_Operation()
+
+    if backend == "local":
+        from shipping.storage_operations.local_operations import Local_Operation
+
+        return Local_Operation()
+
+    raise ValueError(
+        f"{backend} is not a valid storage backend, expected mongodb or local"
+    )
@@ -3,6 +3,7 @@ from shipping.data_type_valid.data_type_valid_pred import DB_Operation_Pred
 from shipping.raw_data_validation.pred_data_validation import Raw_Pred_Data_Validation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from utils.run_report import Run_Report, count_files
 
 
 class Pred_Validation:
@@ -33,12 +34,13 @@ class Pred_Validation:
 
         self.db_operation = DB_Operation_Pred()
 
-    def pred_validation(self):
+    def pred_validation(self, run_report=None):
         """
         Method Name :   pred_validation
         Description :   This method is responsible for converting raw data to cleaned data for prediction
         
-        Output      :   Raw data is converted to cleaned data for prediction
+        Output      :   Raw data is converted to cleaned data for prediction, the stages are recorded in
+                        run_report and a run report is saved if run_report is not given
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -53,51 +55,70 @@ class Pred_Validation:
 
         self.log_writer.start_log("start", **log_dic)
 
+        report = run_report or Run_Report("pred")
+
         try:
             self.log_writer.log("pred Raw Validation started", **log_dic)
 
-            (
-                LengthOfDateStampInFile,
-                LengthOfTimeStampInFile,
-                _,
-                noofcolumns,
-            ) = self.raw_data.values_from_schema()
-
-            regex = self.raw_data.get_regex_pattern()
+            with report.stage("raw_validation") as stage:
+                (
+                    LengthOfDateStampInFile,
+                    LengthOfTimeStampInFile,
+                    column_names,
+                    noofcolumns,
+                ) = self.raw_data.values_from_schema()
 
-            self.raw_data.validate_raw_fname(
-                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile,
-            )
+                regex = self.raw_data.get_regex_pattern()
 
-            self.raw_data.validate_col_length(NumberofColumns=noofcolumns)
+                self.raw_data.validate_raw_fname(
+                    regex, LengthOfDateStampInFile, LengthOfTimeStampInFile,
+                )
 
-            self.raw_data.validate_missing_values_in_col()
+                self.raw_data.validate_col_length(
+                    NumberofColumns=noofcolumns, column_names=column_names
+                )
 
-            self.log_writer.log("Pred Raw Data Validation completed", **log_dic)
+                self.raw_data.validate_missing_values_in_col()
 
-            self.data_transform.apply_log1p_transform()
+                stage.update(
+                    files_accepted=count_files(self.config.good_data_dir("pred")),
+                    files_rejected=count_files(self.config.bad_data_dir("pred")),
+                )
 
-            self.data_transform.apply_clean_customer_location_transformation()
+            self.log_writer.log("Pred Raw Data Validation completed", **log_dic)
 
-            self.data_transform.apply_date_time_transformation()
+            with report.stage("data_transform") as stage:
+                data_files = self.data_transform.apply_transformations()
 
-            self.data_transform.apply_clean_weight_transformation()
+                stage["rows_out"] = sum(n_rows for _, n_rows in data_files)
 
             self.log_writer.log("Pred Data Transformation completed", **log_dic)
 
             self.log_writer.log("Pred Data Type Validation started", **log_dic)
 
-            self.db_operation.insert_good_data_as_record(
-                self.good_data_db_name, self.good_data_collection_name
-            )
+            with report.stage("db_insert") as stage:
+                stage["rows_in"] = sum(n_rows for _, n_rows in data_files)
 
-            self.db_operation.export_collection_to_csv(
-                self.good_data_db_name, self.good_data_collection_name
-            )
+                stage["rows_out"] = self.db_operation.insert_good_data_as_record(
+                    self.good_data_db_name,
+                    self.good_data_collection_name,
+                    [f for f, _ in data_files],
+                )
+
+            with report.stage("db_export") as stage:
+                stage["rows_out"] = self.db_operation.export_collection_to_csv(
+                    self.good_data_db_name, self.good_data_collection_name
+                )
 
             self.log_writer.log("Pred Data Type Validation completed", **log_dic)
 
+            if run_report is None:
+                report.save()
+
             self.log_writer.start_log("exit", **log_dic)
 
         except Exception as e:
+            if run_report is None:
+                report.save("failed")
+
             self.log_writer.exception_log(e, **log_dic)
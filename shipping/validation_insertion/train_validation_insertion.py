@@ -3,6 +3,7 @@ from shipping.data_type_valid.data_type_valid_train import DB_Operation_Train
 from shipping.raw_data_validation.train_data_validation import Raw_Train_Data_Validation
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
+from utils.run_report import Run_Report, count_files
 
 
 class Train_Validation:
@@ -33,12 +34,13 @@ class Train_Validation:
 
         self.db_operation = DB_Operation_Train()
 
-    def train_validation(self):
+    def train_validation(self, run_report=None):
         """
         Method Name :   training_validation
         Description :   This method is responsible for converting raw data to cleaned data for training
         
-        Output      :   Raw data is converted to cleaned data for training
+        Output      :   Raw data is converted to cleaned data for training, the stages are recorded in
+                        run_report and a run report is saved if run_report is not given
         On Failure  :   Write an exception log and then raise an exception
         
         Version     :   1.2
@@ -53,53 +55,72 @@ class Train_Validation:
 
         self.log_writer.start_log("start", **log_dic)
 
+        report = run_report or Run_Report("train")
+
         try:
             self.log_writer.log("Train Raw Validation started", **log_dic)
 
-            (
-                LengthOfDateStampInFile,
-                LengthOfTimeStampInFile,
-                _,
-                noofcolumns,
-            ) = self.raw_data.values_from_schema()
+            with report.stage("raw_validation") as stage:
+                (
+                    LengthOfDateStampInFile,
+                    LengthOfTimeStampInFile,
+                    column_names,
+                    noofcolumns,
+                ) = self.raw_data.values_from_schema()
+
+                regex = self.raw_data.get_regex_pattern()
 
-            regex = self.raw_data.get_regex_pattern()
+                self.raw_data.validate_raw_fname(
+                    regex, LengthOfDateStampInFile, LengthOfTimeStampInFile,
+                )
 
-            self.raw_data.validate_raw_fname(
-                regex, LengthOfDateStampInFile, LengthOfTimeStampInFile,
-            )
+                self.raw_data.validate_col_length(
+                    NumberofColumns=noofcolumns, column_names=column_names
+                )
 
-            self.raw_data.validate_col_length(NumberofColumns=noofcolumns)
+                self.raw_data.validate_missing_values_in_col()
 
-            self.raw_data.validate_missing_values_in_col()
+                stage.update(
+                    files_accepted=count_files(self.config.good_data_dir("train")),
+                    files_rejected=count_files(self.config.bad_data_dir("train")),
+                )
 
             self.log_writer.log("Train Raw Data Validation completed", **log_dic)
 
             self.log_writer.log("Train Data Transformation started", **log_dic)
 
-            self.data_transform.apply_log1p_transform()
-
-            self.data_transform.apply_clean_customer_location_transformation()
-
-            self.data_transform.apply_date_time_transformation()
+            with report.stage("data_transform") as stage:
+                data_files = self.data_transform.apply_transformations()
 
-            self.data_transform.apply_clean_weight_transformation()
+                stage["rows_out"] = sum(n_rows for _, n_rows in data_files)
 
             self.log_writer.log("Train Data Transformation completed", **log_dic)
 
             self.log_writer.log("Train Data Type Validation started", **log_dic)
 
-            self.db_operation.insert_good_data_as_record(
-                self.good_data_db_name, self.good_data_collection_name
-            )
+            with report.stage("db_insert") as stage:
+                stage["rows_in"] = sum(n_rows for _, n_rows in data_files)
 
-            self.db_operation.export_collection_to_csv(
-                self.good_data_db_name, self.good_data_collection_name
-            )
+                stage["rows_out"] = self.db_operation.insert_good_data_as_record(
+                    self.good_data_db_name,
+                    self.good_data_collection_name,
+                    [f for f, _ in data_files],
+                )
+
+            with report.stage("db_export") as stage:
+                stage["rows_out"] = self.db_operation.export_collection_to_csv(
+                    self.good_data_db_name, self.good_data_collection_name
+                )
 
             self.log_writer.log("Train Data Type Validation completed", **log_dic)
 
+            if run_report is None:
+                report.save()
+
             self.log_writer.start_log("exit", **log_dic)
 
         except Exception as e:
+            if run_report is None:
+                report.save("failed")
+
             self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,51 @@
+from glob import glob
+from os.path import abspath
+from shutil import copy
+
+import pytest
+from yaml import safe_dump, safe_load
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    Writes a params file which keeps raw, good and bad data, storage, logs and artifacts in tmp_path and uses
+    the local storage backend, the raw batch folders are filled with the valid given batch files
+    """
+    with open("config/params.yaml") as f:
+        config = safe_load(f)
+
+    for key in ["train", "pred"]:
+        raw_dir = tmp_path / "raw" / key
+
+        raw_dir.mkdir(parents=True)
+
+        for fname in glob(f"data_given/{key}_batch/ship_*_*.csv"):
+            copy(fname, raw_dir)
+
+        config["data"]["raw_data"][key + "_batch"] = str(raw_dir)
+
+        config["data"][key] = {
+            "good_data_dir": str(tmp_path / "data" / "good" / key),
+            "bad_data_dir": str(tmp_path / "data" / "bad" / key),
+        }
+
+    config["dir"] = {"log": str(tmp_path / "logs"), "artifacts": str(tmp_path / "art")}
+
+    config["train_input_dir"] = str(tmp_path / "train_input")
+
+    config["pred_input_dir"] = str(tmp_path / "pred_input")
+
+    config["storage"].update(backend="local", local_dir=str(tmp_path / "storage"))
+
+    config["regex_file"] = abspath(config["regex_file"])
+
+    config["schema_file"] = {k: abspath(v) for k, v in config["schema_file"].items()}
+
+    params_file = tmp_path / "params.yaml"
+
+    params_file.write_text(safe_dump(config))
+
+    monkeypatch.setenv("SHIPPING_PARAMS", str(params_file))
+
+    return config
@@ -0,0 +1,76 @@
+from glob import glob
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ce = pytest.importorskip("category_encoders")
+
+
+@pytest.fixture
+def shipments():
+    return pd.DataFrame(
+        {
+            "Height": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "Material": ["Stone", "Wood", np.nan, "Stone", "Clay"],
+            "Fragile": ["No", "Yes", "No", np.nan, "Yes"],
+            "Weight": [10.0, np.nan, 30.0, 40.0, 50.0],
+        }
+    )
+
+
+def test_lookup_matches_encoder(workspace, shipments):
+    from utils.preprocess_utils import Preprocess_Utils
+
+    preprocess_utils = Preprocess_Utils("test.log")
+
+    one_hot_encoder = ce.OneHotEncoder(
+        cols=["Material"], return_df=True, use_cat_names=True
+    ).fit(shipments)
+
+    one_hot = one_hot_encoder.transform(shipments)
+
+    ordinal_encoder = ce.OrdinalEncoder(cols=["Fragile"], return_df=True).fit(one_hot)
+
+    for encoder, data in [(one_hot_encoder, shipments), (ordinal_encoder, one_hot)]:
+        lookup = preprocess_utils.get_lookup(encoder)
+
+        pd.testing.assert_frame_equal(
+            preprocess_utils.apply_lookup(data, lookup), encoder.transform(data)
+        )
+
+    unknown = shipments.assign(Material="Bronze")
+
+    lookup = preprocess_utils.get_lookup(one_hot_encoder)
+
+    assert preprocess_utils.apply_lookup(unknown, lookup) is None
+
+    data, _ = preprocess_utils.one_hot_encoding(
+        unknown, ["Material"], one_hot_encoder, lookup
+    )
+
+    pd.testing.assert_frame_equal(data, one_hot_encoder.transform(unknown))
+
+
+def test_records_missing_features(workspace):
+    from shipping.model.predict_from_model import Prediction
+
+    shipments = pd.read_csv(sorted(glob("data_given/pred_batch/ship_*_*.csv"))[0])
+
+    header = list(shipments.columns)
+
+    record = shipments.head(1).to_dict("records")[0]
+
+    prediction = Prediction()
+
+    prediction.preprocessor.fitted = {"input_columns": header + ["date_diff"]}
+
+    data = prediction.get_records_as_dataframe(record)
+
+    assert data["Width"].dtype == float and data["Express Shipment"].dtype == object
+
+    del record["Width"], record["Express Shipment"]
+
+    with pytest.raises(Exception, match="Width', 'Express Shipment'\\] features"):
+        prediction.get_records_as_dataframe(record)
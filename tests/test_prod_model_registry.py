@@ -0,0 +1,124 @@
+from os import listdir, makedirs
+from os.path import getmtime, isdir, join
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+ce = pytest.importorskip("category_encoders")
+
+
+@pytest.fixture
+def pushed_model(workspace):
+    from sklearn.dummy import DummyRegressor
+
+    from shipping.model.load_production_model import Load_Prod_Model
+    from utils.model_utils import Model_Utils
+    from utils.read_params import read_params
+
+    config = read_params()
+
+    shipments = pd.DataFrame({"Material": ["Stone", "Wood"], "Fragile": ["No", "Yes"]})
+
+    one_hot_encoder = ce.OneHotEncoder(cols=["Material"], use_cat_names=True)
+
+    preprocessor = {
+        "one_hot_encoder": one_hot_encoder.fit(shipments),
+        "ordinal_encoder": ce.OrdinalEncoder(cols=["Fragile"]).fit(
+            one_hot_encoder.transform(shipments)
+        ),
+    }
+
+    for stage in ["trained", "stag", "prod"]:
+        makedirs(config.model_dir(stage), exist_ok=True)
+
+    model_utils = Model_Utils()
+
+    model = DummyRegressor().fit([[0], [1]], [0, 1])
+
+    model_utils.save_model(model, "test.log")
+
+    model_utils.save_model(preprocessor, "test.log", config["preprocessor_name"])
+
+    Load_Prod_Model().load_production_model([(1.0, model, "DummyRegressor")])
+
+    return model_utils
+
+
+def test_push_writes_manifest_last(pushed_model):
+    from shipping.model.prod_model_registry import Prod_Model_Registry
+
+    assert pushed_model.get_prod_manifest("test.log")["model_name"] == "DummyRegressor"
+
+    entry = Prod_Model_Registry().get_model()
+
+    assert entry["model_name"] == "DummyRegressor"
+
+    prod_model_file, prod_preprocessor_file = pushed_model.get_prod_files("test.log")
+
+    assert entry["version"] == (
+        prod_model_file,
+        getmtime(prod_model_file),
+        getmtime(prod_preprocessor_file),
+    )
+
+
+def test_push_keeps_model_and_preprocessor_pair(pushed_model):
+    from sklearn.dummy import DummyRegressor
+
+    from shipping.model.load_production_model import Load_Prod_Model
+    from shipping.model.prod_model_registry import Prod_Model_Registry
+    from utils.read_params import read_params
+
+    config = read_params()
+
+    registry = Prod_Model_Registry()
+
+    old_files = pushed_model.get_prod_files("test.log")
+
+    old_entry = registry.get_model()
+
+    model = DummyRegressor().fit([[0], [1]], [1, 2])
+
+    pushed_model.save_model(model, "test.log")
+
+    for _ in range(config["prod_pushes_to_keep"] + 1):
+        Load_Prod_Model().load_production_model([(1.0, model, "DummyRegressor")])
+
+    prod_files = pushed_model.get_prod_files("test.log")
+
+    assert prod_files[0] != old_files[0] and prod_files[1] != old_files[1]
+
+    prod_model_dir = config.model_dir("prod")
+
+    push_dirs = [f for f in listdir(prod_model_dir) if isdir(join(prod_model_dir, f))]
+
+    assert len(push_dirs) == config["prod_pushes_to_keep"]
+
+    registry.last_check = None
+
+    entry = registry.get_model()
+
+    assert entry is not old_entry
+
+    assert entry["version"][0] == prod_files[0]
+
+    assert entry["model"].predict([[0]])[0] == 1.5
+
+
+def test_failed_reload_keeps_resident_model(pushed_model):
+    from shipping.model.prod_model_registry import Prod_Model_Registry
+
+    registry = Prod_Model_Registry()
+
+    entry = registry.get_model()
+
+    with open(pushed_model.get_prod_model_file("test.log"), "wb") as f:
+        f.write(b"partial")
+
+    registry.last_check = None
+
+    assert registry.get_model() is entry
+
+    with pytest.raises(Exception):
+        registry.reload()
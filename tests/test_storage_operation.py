@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+
+def test_storage_backend_must_implement_interface(workspace):
+    from shipping.storage_operations.local_operations import Local_Operation
+    from shipping.storage_operations.storage_operation import Storage_Operation
+
+    with pytest.raises(TypeError):
+        Storage_Operation()
+
+    class Insert_Only_Operation(Storage_Operation):
+        def insert_dataframe_as_record(self, *args, **kwargs):
+            return 0
+
+    with pytest.raises(TypeError):
+        Insert_Only_Operation()
+
+    assert isinstance(Local_Operation(), Storage_Operation)
@@ -0,0 +1,35 @@
+from os import listdir
+
+import pytest
+
+pytest.importorskip("pandas")
+
+
+def test_train_validation_runs_twice(workspace):
+    from shipping.validation_insertion.train_validation_insertion import (
+        Train_Validation,
+    )
+
+    good_dir = workspace["data"]["train"]["good_data_dir"]
+
+    for _ in range(2):
+        Train_Validation().train_validation()
+
+        good_files = listdir(good_dir)
+
+        assert good_files and all(f.endswith(".parquet") for f in good_files)
+
+    assert listdir(workspace["data"]["train"]["bad_data_dir"]) == []
+
+
+def test_pred_validation_runs_twice(workspace):
+    from shipping.validation_insertion.prediction_validation_insertion import (
+        Pred_Validation,
+    )
+
+    for _ in range(2):
+        Pred_Validation().pred_validation()
+
+    good_files = listdir(workspace["data"]["pred"]["good_data_dir"])
+
+    assert good_files and all(f.endswith(".parquet") for f in good_files)
@@ -0,0 +1,142 @@
+from concurrent.futures import ProcessPoolExecutor
+from csv import reader
+from os import cpu_count
+
+from pandas import read_csv
+
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+
+def check_col_length(fname, NumberofColumns, column_names=None, n_sample_rows=0):
+    """
+    Method Name :   check_col_length
+    Description :   This method checks the column length of the csv file by reading only the header line and 
+                    a few sample rows, the header is also checked against the column names from schema values
+
+    Output      :   True is returned if the column length and column names are valid else False
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    with open(fname, newline="") as f:
+        csv_reader = reader(f)
+
+        header = next(csv_reader, None)
+
+        if header is None or len(header) != NumberofColumns:
+            return False
+
+        if column_names is not None and not set(column_names).issubset(header):
+            return False
+
+        n_rows = 0
+
+        for row in csv_reader:
+            if n_rows >= n_sample_rows:
+                break
+
+            if not row:
+                continue
+
+            if len(row) != NumberofColumns:
+                return False
+
+            n_rows += 1
+
+    return True
+
+
+def check_missing_values_in_col(fname):
+    """
+    Method Name :   check_missing_values_in_col
+    Description :   This method checks whether the csv file has any column with all the values missing
+
+    Output      :   True is returned if no column is entirely missing else False
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    csv = read_csv(fname)
+
+    for columns in csv:
+        if (len(csv[columns]) - csv[columns].count()) == len(csv[columns]):
+            return False
+
+    return True
+
+
+class Batch_Utils:
+    """
+    Description :   This class is used for running per file batch functions concurrently across cores
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.n_workers = self.config["batch"]["n_workers"]
+
+        self.log_writer = App_Logger()
+
+    def get_n_workers(self, n_tasks):
+        """
+        Method Name :   get_n_workers
+        Description :   This method gets the number of workers to be used for the number of tasks
+
+        Output      :   Number of workers is returned, -1 in params.yaml means all the cores
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        n_workers = cpu_count() if self.n_workers == -1 else self.n_workers
+
+        return max(1, min(n_workers, n_tasks))
+
+    def run_batch(self, func, args_lst, log_file):
+        """
+        Method Name :   run_batch
+        Description :   This method runs the function for each of the arguments tuple in a process pool
+
+        Output      :   A list of results is returned in the same order as the arguments
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.run_batch.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            n_workers = self.get_n_workers(len(args_lst))
+
+            self.log_writer.log(
+                f"Running {func.__name__} for {len(args_lst)} tasks with {n_workers} workers",
+                **log_dic,
+            )
+
+            if n_workers == 1:
+                results = [func(*args) for args in args_lst]
+
+            else:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    futures = [executor.submit(func, *args) for args in args_lst]
+
+                    results = [future.result() for future in futures]
+
+            self.log_writer.log(f"Ran {func.__name__} for all the tasks", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return results
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
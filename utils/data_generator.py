@@ -0,0 +1,390 @@
+"""
+Generates synthetic shipment batch files for load and scale testing, the values follow the distributions of the
+given batch files and the files are valid as per the schema file and ship_regex.txt
+
+Usage       :   python -m utils.data_generator --mode train --rows 1000000 --files 10 --out-dir data/synthetic/train
+"""
+from argparse import ArgumentParser
+from collections import Counter
+from csv import reader, writer
+from datetime import datetime, timedelta
+from json import load
+from os import listdir, makedirs
+from os.path import join
+from random import Random
+from re import match
+
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+
+class Data_Generator:
+    """
+    Description :   This class generates synthetic shipment batch files from a profile of the given batch files.
+                    Rows are written one by one to disk, so that only the profile is held in memory
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.generator_params = self.config["data_generator"]
+
+        self.seed = self.generator_params["seed"]
+
+        self.jitter = self.generator_params["jitter"]
+
+        self.file_interval = self.generator_params["file_interval"]
+
+        self.start_stamp = datetime.strptime(
+            str(self.generator_params["start_stamp"]), "%Y%m%d_%H%M%S"
+        )
+
+        self.id_col = self.generator_params["id_col"]
+
+        self.name_col = self.generator_params["name_col"]
+
+        self.location_col = self.generator_params["location_col"]
+
+        self.date_cols = self.generator_params["date_cols"]
+
+        self.date_format = self.generator_params["date_format"]
+
+        self.regex_file = self.config["regex_file"]
+
+        self.log_file = self.config["log"]["data_generator"]
+
+        self.log_writer = App_Logger()
+
+    def get_schema(self, mode):
+        """
+        Method Name :   get_schema
+        Description :   This method reads the schema file of the mode, which is train or pred
+
+        Output      :   A dict of schema is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_schema.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            with open(self.config.schema_file(mode + "_schema_file")) as f:
+                schema = load(f)
+
+            self.log_writer.log(f"Read {mode} schema file", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return schema
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_profile(self, src_dir, schema, regex):
+        """
+        Method Name :   get_profile
+        Description :   This method builds the profile of the valid batch files of src_dir, which are the header,
+                        the template rows, the numeric columns with their decimals and minimum, the pools of names
+                        and locations and the range of dates
+
+        Output      :   A dict of profile is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_profile.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            header, rows = None, []
+
+            for fname in sorted(listdir(src_dir)):
+                if not match(regex, fname):
+                    continue
+
+                with open(join(src_dir, fname), newline="") as f:
+                    csv_reader = reader(f)
+
+                    file_header = next(csv_reader, None)
+
+                    if file_header is None or (
+                        len(file_header) != schema["NumberofColumns"]
+                    ):
+                        continue
+
+                    header = header or file_header
+
+                    if file_header == header:
+                        rows.extend(r for r in csv_reader if len(r) == len(header))
+
+            if not rows:
+                raise ValueError(f"No valid batch files found in {src_dir} folder")
+
+            numeric_cols = {}
+
+            for i, col in enumerate(header):
+                values = [r[i] for r in rows if r[i] != ""]
+
+                if col in self.date_cols or not values:
+                    continue
+
+                try:
+                    numbers = [float(v) for v in values]
+
+                except ValueError:
+                    continue
+
+                decimals = 0
+
+                if any(x != int(x) for x in numbers):
+                    decimals = Counter(len(v.partition(".")[2]) for v in values)
+
+                    decimals = decimals.most_common(1)[0][0]
+
+                numeric_cols[i] = (decimals, min(numbers))
+
+            names = [r[header.index(self.name_col)].split(" ", 1) for r in rows]
+
+            locations = [
+                r[header.index(self.location_col)].rsplit(", ", 1) for r in rows
+            ]
+
+            locations = [l for l in locations if len(l) == 2]
+
+            dates = [
+                datetime.strptime(r[header.index(c)], self.date_format)
+                for r in rows
+                for c in self.date_cols
+                if r[header.index(c)] != ""
+            ]
+
+            profile = {
+                "header": header,
+                "rows": rows,
+                "numeric_cols": numeric_cols,
+                "first_names": [n[0] for n in names if len(n) == 2],
+                "last_names": [n[1] for n in names if len(n) == 2],
+                "cities": [l[0] for l in locations],
+                "states": [l[1].rsplit(" ", 1)[0] for l in locations],
+                "min_date": min(dates),
+                "n_days": (max(dates) - min(dates)).days,
+            }
+
+            self.log_writer.log(
+                f"Built profile of {len(rows)} rows and {len(header)} columns from {src_dir} folder",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return profile
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_customer_id(self, n):
+        """
+        Method Name :   get_customer_id
+        Description :   This method gets the customer id of the n-th record, in the same utf-16 hex format as the
+                        given batch files
+
+        Output      :   A customer id is returned
+        On Failure  :   Raise an exception
+        """
+        return "fffe" + "".join(f"3{d}00" for d in str(n))
+
+    def get_row(self, profile, rng, n):
+        """
+        Method Name :   get_row
+        Description :   This method generates a row from a random template row of the profile. Numeric values are
+                        jittered, customer id, artist name, customer location and dates are generated, and the
+                        missing values of the template are kept so that null rates follow the given files
+
+        Output      :   A list of row values is returned
+        On Failure  :   Raise an exception
+        """
+        header = profile["header"]
+
+        row = list(rng.choice(profile["rows"]))
+
+        for i, (decimals, min_value) in profile["numeric_cols"].items():
+            if row[i] == "":
+                continue
+
+            value = float(row[i]) * (1 + rng.gauss(0, self.jitter))
+
+            if min_value >= 0:
+                value = max(value, min_value)
+
+            row[i] = str(float(round(value, decimals)))
+
+        row[header.index(self.id_col)] = self.get_customer_id(n)
+
+        if row[header.index(self.name_col)] != "":
+            row[header.index(self.name_col)] = (
+                rng.choice(profile["first_names"])
+                + " "
+                + rng.choice(profile["last_names"])
+            )
+
+        if row[header.index(self.location_col)] != "":
+            row[header.index(self.location_col)] = (
+                f"{rng.choice(profile['cities'])}, {rng.choice(profile['states'])} "
+                f"{rng.randint(501, 99950):05d}"
+            )
+
+        anchor = profile["min_date"] + timedelta(days=rng.randint(0, profile["n_days"]))
+
+        first_date = row[header.index(self.date_cols[0])]
+
+        for c in self.date_cols:
+            i = header.index(c)
+
+            if row[i] == "":
+                continue
+
+            offset = timedelta(0)
+
+            if first_date != "":
+                offset = datetime.strptime(
+                    row[i], self.date_format
+                ) - datetime.strptime(first_date, self.date_format)
+
+            row[i] = (anchor + offset).strftime(self.date_format)
+
+        return row
+
+    def get_batch_file_name(self, schema, regex, file_no):
+        """
+        Method Name :   get_batch_file_name
+        Description :   This method gets the name of the batch file with the date and time stamp of the file number,
+                        the name is checked against the regex and the stamp lengths of the schema file
+
+        Output      :   A batch file name is returned
+        On Failure  :   Raise an exception
+        """
+        stamp = self.start_stamp + timedelta(seconds=file_no * self.file_interval)
+
+        date_stamp, time_stamp = stamp.strftime("%Y%m%d"), stamp.strftime("%H%M%S")
+
+        fname = f"ship_{date_stamp}_{time_stamp}.csv"
+
+        if (
+            not match(regex, fname)
+            or len(date_stamp) != schema["LengthOfDateStampInFile"]
+            or len(time_stamp) != schema["LengthOfTimeStampInFile"]
+        ):
+            raise ValueError(f"{fname} is not a valid batch file name as per schema")
+
+        return fname
+
+    def generate_batch_files(self, mode, n_rows, n_files, out_dir, src_dir=None):
+        """
+        Method Name :   generate_batch_files
+        Description :   This method writes n_rows synthetic records of the mode as n_files batch files in out_dir,
+                        the profile is built from src_dir which defaults to the raw batch folder of the mode. Each
+                        file is seeded with its file number, so that the same files are generated for a seed
+
+        Output      :   A list of written batch files is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.generate_batch_files.__name__,
+            __file__,
+            self.log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            schema = self.get_schema(mode)
+
+            with open(self.regex_file) as f:
+                regex = f.read().strip()
+
+            src_dir = src_dir or self.config["data"]["raw_data"][mode + "_batch"]
+
+            profile = self.get_profile(src_dir, schema, regex)
+
+            makedirs(out_dir, exist_ok=True)
+
+            files, n = [], 10 ** 5
+
+            for file_no in range(n_files):
+                rng = Random(self.seed + file_no)
+
+                file_rows = n_rows // n_files + (1 if file_no < n_rows % n_files else 0)
+
+                batch_file = join(
+                    out_dir, self.get_batch_file_name(schema, regex, file_no)
+                )
+
+                with open(batch_file, "w", newline="") as f:
+                    csv_writer = writer(f)
+
+                    csv_writer.writerow(profile["header"])
+
+                    for _ in range(file_rows):
+                        csv_writer.writerow(self.get_row(profile, rng, n))
+
+                        n += 1
+
+                files.append(batch_file)
+
+                self.log_writer.log(
+                    f"Wrote {file_rows} records to {batch_file} file", **log_dic
+                )
+
+            self.log_writer.log(
+                f"Generated {n_rows} {mode} records as {n_files} batch files in {out_dir} folder",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return files
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+
+def main():
+    parser = ArgumentParser()
+
+    parser.add_argument("--mode", choices=["train", "pred"], default="train")
+
+    parser.add_argument("--rows", type=int, default=100000)
+
+    parser.add_argument("--files", type=int, default=10)
+
+    parser.add_argument("--out-dir", required=True)
+
+    parser.add_argument("--src-dir", default=None)
+
+    args = parser.parse_args()
+
+    files = Data_Generator().generate_batch_files(
+        args.mode, args.rows, args.files, args.out_dir, args.src_dir
+    )
+
+    print(f"Wrote {args.rows} records to {len(files)} batch files in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,16 +76,13 @@ class Data_Transform_Utils:
         try:
             self.log_writer.log("Cleaning weight col in the dataframe", **log_dic)
 
-            converted_list_1 = []
-
-            for i in df:
-                converted_list_1.append(round(float(i), 2))
+            converted_series = df.astype("float").round(2)
 
             self.log_writer.log("Cleaned weight column in the dataframe", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return converted_list_1
+            return converted_series
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -120,18 +117,15 @@ class Data_Transform_Utils:
         try:
             self.log_writer.log("Started cleaning date for the dataframe", **log_dic)
 
-            converted_list_1 = []
-
             date_diff = df["Scheduled Date"] - df["Delivery Date"]
 
-            for i in date_diff:
-                converted_list_1.append(str(i).split()[0])
+            converted_series = date_diff.dt.days
 
             self.log_writer.log("Cleaning date for the dataframe", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return converted_list_1
+            return converted_series
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -151,10 +145,7 @@ class Data_Transform_Utils:
                 "Cleaning customer location data for dataframe", **log_dic
             )
 
-            converted_list_1 = []
-
-            for i in df:
-                converted_list_1.append(i.split()[-2])
+            converted_series = df.str.split().str[-2]
 
             self.log_writer.log(
                 "Cleaned customer location data for dataframe", **log_dic
@@ -162,7 +153,7 @@ class Data_Transform_Utils:
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return converted_list_1
+            return converted_series
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -1,10 +1,118 @@
+from atexit import register
 from datetime import datetime
-from logging import basicConfig, error, info, shutdown
-from os import makedirs
+from logging import ERROR, INFO, FileHandler, Formatter, Handler, Logger
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing.util import Finalize
+from os import getpid, makedirs
 from os.path import basename, join, split
+from queue import Queue
 from sys import exc_info
+from threading import Lock
 
 from utils.read_params import read_params
+from utils.tracer import get_tracer
+
+_backend = {"pid": None, "logger": None, "listener": None}
+
+_backend_lock = Lock()
+
+_log_files = {}
+
+
+class Log_File_Router(Handler):
+    """
+    Description :   This handler writes each log record to the file handler of its log file, file handlers are
+                    created once per log file and reused
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, log_params):
+        super().__init__()
+
+        self.filemode = log_params.get("filemode", "a")
+
+        self.formatter = Formatter(log_params.get("format"), log_params.get("datefmt"))
+
+        self.file_handlers = {}
+
+    def emit(self, record):
+        handler = self.file_handlers.get(record.log_path)
+
+        if handler is None:
+            handler = FileHandler(record.log_path, mode=self.filemode)
+
+            handler.setFormatter(self.formatter)
+
+            self.file_handlers[record.log_path] = handler
+
+        handler.handle(record)
+
+    def close(self):
+        for handler in self.file_handlers.values():
+            handler.close()
+
+        self.file_handlers = {}
+
+        super().close()
+
+
+def stop_backend():
+    """
+    Method Name :   stop_backend
+    Description :   This method stops the queue listener of the current process after writing the queued log records
+
+    Output      :   Queued log records are written and log files are closed
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    with _backend_lock:
+        if _backend["pid"] == getpid() and _backend["listener"] is not None:
+            _backend["listener"].stop()
+
+            for handler in _backend["listener"].handlers:
+                handler.close()
+
+        _backend.update({"pid": None, "logger": None, "listener": None})
+
+
+def get_backend_logger(log_params):
+    """
+    Method Name :   get_backend_logger
+    Description :   This method gets the queue backed logger of the current process, the queue listener and file
+                    handlers are configured once per process so that logging calls only enqueue a record
+
+    Output      :   A logger writing to the log queue is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if _backend["pid"] == getpid():
+        return _backend["logger"]
+
+    with _backend_lock:
+        if _backend["pid"] != getpid():
+            log_queue = Queue(-1)
+
+            logger = Logger("shipping", level=log_params.get("level", INFO))
+
+            logger.addHandler(QueueHandler(log_queue))
+
+            listener = QueueListener(log_queue, Log_File_Router(log_params))
+
+            listener.start()
+
+            _backend.update({"pid": getpid(), "logger": logger, "listener": listener})
+
+            register(stop_backend)
+
+            Finalize(None, stop_backend, exitpriority=0)
+
+    return _backend["logger"]
 
 
 class App_Logger:
@@ -15,53 +123,60 @@ class App_Logger:
 
         self.log_params = self.config["log_params"]
 
+        self.log_entry_exit = self.config["tracing"]["log_entry_exit"]
+
         self.current_date = f"{datetime.now().strftime('%Y-%m-%d')}"
 
     def get_log_file(self, log_file):
         """
         Method Name :   get_log_file
-        Description :   This method gets the log file with path from the log_file key
-        
+        Description :   This method gets the log file with path from the log_file key, the resolved path is cached
+                        and the log folder is created only once
+
         Output      :   The log file with path is returned
-        On Failure  :   Raise an exception 
-        
+        On Failure  :   Raise an exception
+
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
         try:
-            makedirs(self.log_dir, exist_ok=True)
+            key = (self.log_dir, self.current_date, log_file)
+
+            if key not in _log_files:
+                makedirs(self.log_dir, exist_ok=True)
 
-            log_f = self.current_date + "-" + log_file
+                log_f = self.current_date + "-" + log_file
 
-            log_file = join(self.log_dir, log_f)
+                _log_files[key] = join(self.log_dir, log_f)
 
-            return log_file
+            return _log_files[key]
 
         except Exception as e:
             raise e
 
-    def log(self, log_message, class_name, method_name, file, log_file):
+    def log(self, log_message, class_name, method_name, file, log_file, level=INFO):
         """
         Method Name :   log
-        Description :   This method writes the log info using current date and time
-        
+        Description :   This method writes the log info using current date and time, the record is only queued
+                        and written to the log file by the queue listener
+
         Output      :   log information is written to file
         On Failure  :   Raise an exception
-        
+
         Version     :   1.2
         Revisions   :   moved setup to cloud
         """
         try:
-            log_file = self.get_log_file(log_file)
-
-            basicConfig(filename=log_file, **self.log_params)
+            logger = get_backend_logger(self.log_params)
 
-            info(
+            logger.log(
+                level,
                 log_message,
                 extra={
                     "class_name": class_name,
                     "method_name": method_name,
                     "file_name": basename(file),
+                    "log_path": self.get_log_file(log_file),
                 },
             )
 
@@ -71,9 +186,10 @@ class App_Logger:
     def start_log(self, key, class_name, method_name, file, log_file):
         """
         Method Name :   start_log
-        Description :   This method creates an entry point log in log file
+        Description :   This method opens the span of the method on start and closes it on exit, the entry and exit
+                        log is written only if log_entry_exit is set in tracing of params.yaml
 
-        Output      :   An entry log information is written to log file
+        Output      :   Span of the method is recorded and entry or exit log information is written to log file
         On Failure  :   Raise an exception
 
         Version     :   1.2
@@ -83,11 +199,18 @@ class App_Logger:
         start_method_name = self.start_log.__name__
 
         try:
-            func = lambda: "Entered" if key == "start" else "Exited"
+            if key == "start":
+                get_tracer().start_span(f"{class_name}.{method_name}")
 
-            log_msg = f"{func()} {method_name} method of class {class_name}"
+            else:
+                get_tracer().end_span(f"{class_name}.{method_name}")
 
-            self.log(log_msg, class_name, method_name, file, log_file)
+            if self.log_entry_exit:
+                func = lambda: "Entered" if key == "start" else "Exited"
+
+                log_msg = f"{func()} {method_name} method of class {class_name}"
+
+                self.log(log_msg, class_name, method_name, file, log_file)
 
         except Exception as e:
             error_msg = f"Exception occured in Class : {class_name}, Method : {start_method_name}, Error : {str(e)}"
@@ -97,7 +220,8 @@ class App_Logger:
     def exception_log(self, exception, class_name, method_name, file, log_file):
         """
         Method Name :   exception_log
-        Description :   This method creates an exception log in log file and raises Exception
+        Description :   This method closes the span of the method with the error, creates an exception log in
+                        log file and raises Exception
 
         Output      :   Exception information is written to log file
         On Failure  :   Raise an exception
@@ -111,25 +235,17 @@ class App_Logger:
 
         exception_msg = f"Exception occured in Class : {class_name}, Method : {method_name}, Script : {filename}, Line : {exc_tb.tb_lineno}, Error : {str(exception)}"
 
-        log_file = self.get_log_file(log_file)
-
-        basicConfig(filename=log_file, **self.log_params)
+        get_tracer().end_span(f"{class_name}.{method_name}", error=str(exception))
 
-        error(
-            exception_msg,
-            extra={
-                "class_name": class_name,
-                "method_name": method_name,
-                "file_name": basename(file),
-            },
-        )
+        self.log(exception_msg, class_name, method_name, file, log_file, level=ERROR)
 
         raise Exception(exception_msg)
 
     def stop_log(self):
         """
         Method Name :   stop_log
-        Description :   This method stops the logging for the system by exiting all the existing handlers
+        Description :   This method stops the logging for the system by writing the queued log records and closing
+                        all the log files
 
         Output      :   Logging of information is stopped by python logger
         On Failure  :   Write an exception log and then raise an exception
@@ -138,7 +254,7 @@ class App_Logger:
         Revisions   :   moved setup to cloud
         """
         try:
-            shutdown()
+            stop_backend()
 
         except Exception as e:
             raise e
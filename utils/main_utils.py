@@ -1,9 +1,14 @@
 from cmath import log
 from json import load
 from os import listdir, makedirs
-from os.path import isdir
+from glob import glob
+from os.path import isdir, join, splitext
+from shutil import rmtree
 
-from pandas import read_csv
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas import read_csv, read_feather, read_parquet
+from pandas.api.types import is_datetime64_any_dtype
 
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
@@ -116,7 +121,8 @@ class Main_Utils:
     def create_dirs_for_good_bad_data(self, key, log_file):
         """
         Method Name :   create_dirs_for_good_bad_data
-        Description :   This method creates good and bad data folders 
+        Description :   This method creates empty good and bad data folders, the folders of a previous run are
+                        removed first so that its files and intermediate files are not validated again
 
         Output      :   Good and bad data folder are created
         On Failure  :   Write an exception log and then raise an exception
@@ -136,9 +142,17 @@ class Main_Utils:
         try:
             self.log_writer.log("Creating folders for good and bad data", **log_dic)
 
-            self.good_data_dir = self.config["data"][key]["good_data_dir"]
+            self.good_data_dir = self.config.good_data_dir(key)
 
-            self.bad_data_dir = self.config["data"][key]["bad_data_dir"]
+            self.bad_data_dir = self.config.bad_data_dir(key)
+
+            for folder in [self.good_data_dir, self.bad_data_dir]:
+                if isdir(folder):
+                    rmtree(folder)
+
+                    self.log_writer.log(
+                        f"Removed {folder} folder of previous run", **log_dic
+                    )
 
             self.create_directory(self.good_data_dir, log_file)
 
@@ -151,10 +165,240 @@ class Main_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def get_arrow_schema(self, data_frame, col_types=None):
+        """
+        Method Name :   get_arrow_schema
+        Description :   This method gets the pyarrow schema of the dataframe, the columns present in col_types
+                        (ColName of schema file) get the schema dtype, datetime columns are stored as timestamp
+                        and the rest are inferred from the dataframe
+
+        Output      :   A pyarrow schema is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        dtypes = {"string": pa.string(), "float": pa.float64()}
+
+        col_types = col_types or {}
+
+        fields = []
+
+        for field in pa.Schema.from_pandas(data_frame, preserve_index=False):
+            if is_datetime64_any_dtype(data_frame[field.name]):
+                field = field.with_type(pa.timestamp("ns"))
+
+            elif col_types.get(field.name) in dtypes:
+                field = field.with_type(dtypes[col_types[field.name]])
+
+            fields.append(field)
+
+        return pa.schema(fields)
+
+    def read_frame(self, file, log_file):
+        """
+        Method Name :   read_frame
+        Description :   This method reads the dataframe from csv, parquet or feather file based on the file extension,
+                        a folder of parquet files is read as one dataframe
+
+        Output      :   A pandas dataframe is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.read_frame.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            ext = splitext(file)[1]
+
+            if ext == ".parquet":
+                df = read_parquet(file)
+
+            elif ext == ".feather":
+                df = read_feather(file)
+
+            else:
+                df = read_csv(file)
+
+            self.log_writer.log(f"Read {file} file as dataframe", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return df
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def read_frame_chunks(self, file, chunk_size, log_file):
+        """
+        Method Name :   read_frame_chunks
+        Description :   This method reads the csv, parquet or feather file in chunks of chunk_size rows, a folder of
+                        parquet files is read part file by part file. Feather files are read at once
+
+        Output      :   A generator of dataframes is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.read_frame_chunks.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            ext = splitext(file)[1]
+
+            n_chunks = 0
+
+            if ext == ".parquet":
+                parts = [file]
+
+                if isdir(file):
+                    parts = sorted(glob(join(file, "*.parquet")))
+
+                chunks = (
+                    batch.to_pandas()
+                    for part in parts
+                    for batch in pq.ParquetFile(part).iter_batches(chunk_size)
+                )
+
+            elif ext == ".feather":
+                chunks = iter([read_feather(file)])
+
+            else:
+                chunks = read_csv(file, chunksize=chunk_size)
+
+            for df in chunks:
+                n_chunks += 1
+
+                yield df
+
+            self.log_writer.log(f"Read {file} file as {n_chunks} chunks", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def write_frame_chunks(self, data_frames, file, log_file, col_types=None):
+        """
+        Method Name :   write_frame_chunks
+        Description :   This method writes the dataframes to one csv or parquet file as they come, so that all of
+                        them are never in memory at once. Parquet files are written with the schema dtypes of
+                        col_types, the schema of the first dataframe is used for the rest
+
+        Output      :   Number of written records is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.write_frame_chunks.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            is_parquet = splitext(file)[1] == ".parquet"
+
+            writer, n_records = None, 0
+
+            for df in data_frames:
+                if is_parquet:
+                    if writer is None:
+                        schema = self.get_arrow_schema(df, col_types)
+
+                        writer = pq.ParquetWriter(file, schema)
+
+                    writer.write_table(
+                        pa.Table.from_pandas(
+                            df, schema=writer.schema, preserve_index=False
+                        )
+                    )
+
+                else:
+                    df.to_csv(
+                        file,
+                        index=None,
+                        header=n_records == 0,
+                        mode="w" if n_records == 0 else "a",
+                    )
+
+                n_records += len(df)
+
+            if writer is not None:
+                writer.close()
+
+            self.log_writer.log(f"Wrote {n_records} records to {file} file", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return n_records
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def write_frame(self, data_frame, file, log_file, col_types=None):
+        """
+        Method Name :   write_frame
+        Description :   This method writes the dataframe to csv, parquet or feather file based on the file extension,
+                        parquet files are written with the schema dtypes of col_types
+
+        Output      :   The dataframe is written to the file
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.write_frame.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            ext = splitext(file)[1]
+
+            if ext == ".parquet":
+                table = pa.Table.from_pandas(
+                    data_frame,
+                    schema=self.get_arrow_schema(data_frame, col_types),
+                    preserve_index=False,
+                )
+
+                pq.write_table(table, file)
+
+            elif ext == ".feather":
+                data_frame.reset_index(drop=True).to_feather(file)
+
+            else:
+                data_frame.to_csv(file, index=None, header=True)
+
+            self.log_writer.log(f"Wrote dataframe to {file} file", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def read_csv_from_folder(self, folder_name, log_file):
         """
         Method Name :   read_csv_from_folder
-        Description :   This method reads the csv files from the folder 
+        Description :   This method reads the csv, parquet and feather files from the folder
 
         Output      :   A list of dataframes is returned
         On Failure  :   Write an exception log and then raise an exception
@@ -179,11 +423,11 @@ class Main_Utils:
             for f in listdir(folder_name):
                 fname = folder_name + "/" + f
 
-                if fname.endswith(".csv"):
-                    df = read_csv(fname)
+                if splitext(fname)[1] in (".csv", ".parquet", ".feather"):
+                    df = self.read_frame(fname, log_file)
 
                     self.log_writer.log(
-                        f"Read {fname} csv file from folder as dataframe", **log_dic
+                        f"Read {fname} file from folder as dataframe", **log_dic
                     )
 
                     csv_lst.append(df)
@@ -194,7 +438,8 @@ class Main_Utils:
 
                 else:
                     self.log_writer.log(
-                        f"{fname} is not a csv file, not reading it from folder"
+                        f"{fname} is not a data file, not reading it from folder",
+                        **log_dic,
                     )
 
             self.log_writer.log(
@@ -231,16 +476,13 @@ class Main_Utils:
         try:
             self.log_writer.log("Creating model folders", **log_dic)
 
-            folders = list(self.config["model_dir"].values())
+            folders = [
+                self.config.model_dir(stage) for stage in self.config["model_dir"]
+            ]
 
             self.log_writer.log("Got a list of model folders to create", **log_dic)
 
-            [
-                self.create_directory(
-                    self.config["dir"]["artifacts"] + "/" + f, log_file
-                )
-                for f in folders
-            ]
+            [self.create_directory(f, log_file) for f in folders]
 
             self.log_writer.log("Created model folders", **log_dic)
 
@@ -0,0 +1,481 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+from utils.read_params import read_params
+
+
+class Metric:
+    """
+    Description :   This class is the base of the metrics, the values are kept per tuple of label values and updated
+                    under a lock so that metrics can be updated from any thread
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    kind = None
+
+    def __init__(self, name, description, label_names=()):
+        self.name = name
+
+        self.description = description
+
+        self.label_names = tuple(label_names)
+
+        self.lock = Lock()
+
+        self.values = {}
+
+    def get_key(self, labels):
+        """
+        Method Name :   get_key
+        Description :   This method gets the key of the label values in the order of label names
+
+        Output      :   A tuple of label values is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} metric expects {list(self.label_names)} labels, got {list(labels)}"
+            )
+
+        return tuple(str(labels[l]) for l in self.label_names)
+
+    def get_labels(self, key, extra=None):
+        """
+        Method Name :   get_labels
+        Description :   This method formats the label values of the key as prometheus labels
+
+        Output      :   A string of labels is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        pairs = list(zip(self.label_names, key)) + (extra or [])
+
+        if not pairs:
+            return ""
+
+        escape = lambda v: (
+            v.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+        )
+
+        return "{" + ",".join(f'{l}="{escape(v)}"' for l, v in pairs) + "}"
+
+    def clear(self):
+        """
+        Method Name :   clear
+        Description :   This method clears the values of all label values under the lock
+
+        Output      :   Metric values are cleared
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            self.values = {}
+
+    def reset(self):
+        """
+        Method Name :   reset
+        Description :   This method recreates the lock and clears the values, it is only called in a forked process
+                        where the inherited lock may be held by a thread which does not exist in the process
+
+        Output      :   Metric lock and values are reset
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.lock = Lock()
+
+        self.values = {}
+
+    def dump(self):
+        with self.lock:
+            return [[list(k), v] for k, v in self.values.items()]
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+        with self.lock:
+            for key, value in self.values.items():
+                lines.append(f"{self.name}{self.get_labels(key)} {float(value)}")
+
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, value=1, **labels):
+        """
+        Method Name :   inc
+        Description :   This method increments the counter of the label values by value
+
+        Output      :   Counter is incremented
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = self.get_key(labels)
+
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def merge(self, values):
+        with self.lock:
+            for key, value in values:
+                key = tuple(key)
+
+                self.values[key] = self.values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        """
+        Method Name :   set
+        Description :   This method sets the gauge of the label values to value
+
+        Output      :   Gauge is set
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = self.get_key(labels)
+
+        with self.lock:
+            self.values[key] = value
+
+    def replace(self, value, **labels):
+        """
+        Method Name :   replace
+        Description :   This method clears the gauge and sets the label values to value under one lock, so that a
+                        render never sees the gauge without a value
+
+        Output      :   Gauge is replaced
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = self.get_key(labels)
+
+        with self.lock:
+            self.values = {key: value}
+
+    def merge(self, values):
+        with self.lock:
+            self.values.update((tuple(key), value) for key, value in values)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, label_names=(), buckets=()):
+        super().__init__(name, description, label_names)
+
+        self.buckets = sorted(float(b) for b in buckets)
+
+    def observe(self, value, **labels):
+        """
+        Method Name :   observe
+        Description :   This method counts the value in its bucket and adds it to the sum of the label values
+
+        Output      :   Value is observed
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        key = self.get_key(labels)
+
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+
+            value_dic = self.values[key]
+
+            value_dic["counts"][bisect_left(self.buckets, value)] += 1
+
+            value_dic["sum"] += value
+
+            value_dic["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Method Name :   time
+        Description :   This method observes the wall time of the with block
+
+        Output      :   Wall time of the with block is observed
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        start = perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def dump(self):
+        with self.lock:
+            return [
+                [
+                    list(k),
+                    {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]},
+                ]
+                for k, v in self.values.items()
+            ]
+
+    def merge(self, values):
+        with self.lock:
+            for key, value in values:
+                key = tuple(key)
+
+                if key not in self.values:
+                    self.values[key] = {
+                        "counts": [0] * (len(self.buckets) + 1),
+                        "sum": 0.0,
+                        "count": 0,
+                    }
+
+                value_dic = self.values[key]
+
+                value_dic["counts"] = [
+                    a + b for a, b in zip(value_dic["counts"], value["counts"])
+                ]
+
+                value_dic["sum"] += value["sum"]
+
+                value_dic["count"] += value["count"]
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+        with self.lock:
+            for key, value in self.values.items():
+                total = 0
+
+                for le, count in zip(self.buckets + ["+Inf"], value["counts"]):
+                    total += count
+
+                    labels = self.get_labels(key, [("le", str(le))])
+
+                    lines.append(f"{self.name}_bucket{labels} {total}")
+
+                labels = self.get_labels(key)
+
+                lines.append(f"{self.name}_sum{labels} {value['sum']}")
+
+                lines.append(f"{self.name}_count{labels} {value['count']}")
+
+        return lines
+
+
+class Metrics_Registry:
+    """
+    Description :   This class keeps the metrics of the process by name, renders them in prometheus text format and
+                    dumps them as json so that metrics of job processes can be merged in the app process
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+
+        self.metrics = {}
+
+    def get_metric(self, metric_class, name, description, label_names=(), **kwargs):
+        """
+        Method Name :   get_metric
+        Description :   This method gets the metric of the name, the metric is created on first use
+
+        Output      :   A metric is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = metric_class(
+                    name, description, label_names, **kwargs
+                )
+
+            return self.metrics[name]
+
+    def render(self):
+        """
+        Method Name :   render
+        Description :   This method renders all the metrics in prometheus text exposition format
+
+        Output      :   A string of metrics is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        lines = []
+
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """
+        Method Name :   dump
+        Description :   This method dumps the values of all the metrics as json serializable dict
+
+        Output      :   A dict of metric name and values is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        return {name: metric.dump() for name, metric in list(self.metrics.items())}
+
+    def merge(self, dump):
+        """
+        Method Name :   merge
+        Description :   This method merges the dumped metrics of another process, counters and histograms are added
+                        and gauges are overwritten
+
+        Output      :   Metrics are merged
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        for name, values in (dump or {}).items():
+            if name in self.metrics:
+                self.metrics[name].merge(values)
+
+    def reset(self):
+        """
+        Method Name :   reset
+        Description :   This method clears all the metrics, it is called in a forked job process so that only the
+                        metrics of the job are dumped and no lock is inherited in the locked state
+
+        Output      :   Metrics are cleared
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.lock = Lock()
+
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+_registry = Metrics_Registry()
+
+
+class App_Metrics:
+    """
+    Description :   This class gets the metrics of the app and pipeline stages from the metrics registry of the
+                    process, updating a metric only takes a lock and a dict update. The /train and /predict requests
+                    only submit a job, so their request latency is the submission time and the pipeline time is
+                    recorded per stage in stage_seconds
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self):
+        self.config = read_params()
+
+        self.buckets = self.config["metrics"]["buckets"]
+
+        self.registry = _registry
+
+        self.requests = self.registry.get_metric(
+            Counter,
+            "shipping_http_requests_total",
+            "Number of http requests",
+            ("path", "method", "status"),
+        )
+
+        self.request_seconds = self.registry.get_metric(
+            Histogram,
+            "shipping_http_request_duration_seconds",
+            "Latency of http requests in seconds, job submission only for /train and /predict",
+            ("path",),
+            buckets=self.buckets["request_seconds"],
+        )
+
+        self.jobs = self.registry.get_metric(
+            Counter,
+            "shipping_jobs_total",
+            "Number of finished train and predict jobs",
+            ("kind", "status"),
+        )
+
+        self.stage_seconds = self.registry.get_metric(
+            Histogram,
+            "shipping_stage_duration_seconds",
+            "Wall time of pipeline stages in seconds",
+            ("stage",),
+            buckets=self.buckets["stage_seconds"],
+        )
+
+        self.stage_rows = self.registry.get_metric(
+            Counter,
+            "shipping_stage_rows_total",
+            "Number of rows processed by pipeline stages",
+            ("stage",),
+        )
+
+        self.model_load_seconds = self.registry.get_metric(
+            Histogram,
+            "shipping_model_load_duration_seconds",
+            "Time to load the prod model and preprocessor in seconds",
+            buckets=self.buckets["model_load_seconds"],
+        )
+
+        self.prod_model = self.registry.get_metric(
+            Gauge,
+            "shipping_prod_model_version",
+            "Push time of the resident prod model, labelled with the model",
+            ("model_name", "model_file"),
+        )
+
+    def render(self):
+        return self.registry.render()
+
+    def dump(self):
+        return self.registry.dump()
+
+    def merge(self, dump):
+        self.registry.merge(dump)
+
+    def reset(self):
+        self.registry.reset()
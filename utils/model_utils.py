@@ -1,16 +1,78 @@
+from collections import defaultdict
+from json import load as json_load
 from os import listdir
-from os.path import join
+from os.path import getmtime, isfile, join
 from pickle import dump, load
+from time import perf_counter
 
+import numpy as np
 import xgboost
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa
 from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
-from sklearn.utils import all_estimators
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    KFold,
+    ParameterGrid,
+    ParameterSampler,
+    RandomizedSearchCV,
+)
+from sklearn.utils import _safe_indexing, all_estimators
+from threadpoolctl import threadpool_limits
 
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic, read_params
 
 
+def fit_and_score(model, params, x, y, train_idx=None, test_idx=None):
+    """
+    Method Name :   fit_and_score
+    Description :   This method fits a clone of the model with the params on the train fold and scores it on the
+                    test fold, the model is fitted on all of x and y if no fold is given. Native thread pools are
+                    limited to one thread since the tasks already run in parallel
+
+    Output      :   A tuple of fitted model, r2 score on the test fold and fit time is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    model = clone(model).set_params(**params)
+
+    with threadpool_limits(limits=1):
+        start = perf_counter()
+
+        if train_idx is None:
+            model.fit(x, y)
+
+            return model, None, perf_counter() - start
+
+        model.fit(_safe_indexing(x, train_idx), _safe_indexing(y, train_idx))
+
+        fit_time = perf_counter() - start
+
+        preds = model.predict(_safe_indexing(x, test_idx))
+
+    return model, r2_score(_safe_indexing(y, test_idx), preds), fit_time
+
+
+def get_search_time(search_cv):
+    """
+    Method Name :   get_search_time
+    Description :   This method gets the fit time of all the candidates and folds of the fitted search cv, which
+                    is the search time of the model without the refit of the best params
+
+    Output      :   Search time in seconds is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return float(np.sum(search_cv.cv_results_["mean_fit_time"]) * search_cv.n_splits_)
+
+
 class Model_Utils:
     """
     Description :   This class is used for model utility functions required in model training
@@ -24,20 +86,33 @@ class Model_Utils:
 
         self.tuner_kwargs = self.config["model_utils"]
 
-        self.artifact_folder = self.config["dir"]["artifacts"]
+        self.n_jobs_params = ["n_jobs", "nthread"]
 
-        self.trained_models_dir = (
-            self.artifact_folder + "/" + self.config["model_dir"]["trained"]
-        )
+        self.search_strategies = self.config["model_search"]["strategy"]
+
+        self.random_state = self.config["base"]["random_state"]
+
+        self.model_timings = {}
+
+        self.artifact_folder = self.config.artifacts_dir()
+
+        self.trained_models_dir = self.config.model_dir("trained")
 
         self.save_format = self.config["save_format"]
 
+        self.preprocessor_name = self.config["preprocessor_name"]
+
+        self.prod_manifest_file = join(
+            self.config.model_dir("prod"), self.config["prod_manifest_file"]
+        )
+
         self.log_writer = App_Logger()
 
-    def get_model_score(self, model, test_x, test_y, log_file):
+    def get_model_score(self, model, test_x, test_y, log_file, preds=None):
         """
         Method Name :   get_model_score
-        Description :   This method gets model score againist the test data
+        Description :   This method gets model score againist the test data, preds are used if the predictions on
+                        test data are already made
 
         Output      :   A model score is returned 
         On Failure  :   Write an exception log and then raise an exception
@@ -54,11 +129,13 @@ class Model_Utils:
         try:
             model_name = model.__class__.__name__
 
-            preds = model.predict(test_x)
+            if preds is None:
+                preds = model.predict(test_x)
 
-            self.log_writer.log(
-                f"Used {model_name} model to get predictions on test data", **log_dic
-            )
+                self.log_writer.log(
+                    f"Used {model_name} model to get predictions on test data",
+                    **log_dic,
+                )
 
             self.model_score = r2_score(test_y, preds)
 
@@ -95,9 +172,7 @@ class Model_Utils:
 
             self.model_param_grid = self.config["train_model"][model_name]
 
-            self.model_grid = GridSearchCV(
-                model, self.model_param_grid, **self.tuner_kwargs
-            )
+            self.model_grid = self.get_search_cv(model, log_file)
 
             self.log_writer.log(
                 f"Initialized {self.model_grid.__class__.__name__}  with {self.model_param_grid} as params",
@@ -158,7 +233,9 @@ class Model_Utils:
     def get_tuned_model(self, model_name, train_x, train_y, test_x, test_y, log_file):
         """
         Method Name :   get_tuned_model
-        Description :   This method tuned the base model based on the training data
+        Description :   This method tuned the base model based on the training data, the best estimator refitted
+                        by the search cv is used and predicted once. Search, refit and predict timings are kept in
+                        model_timings
 
         Output      :   Tuned model is returned based on the training data
         On Failure  :   Write an exception log and then raise an exception
@@ -179,51 +256,354 @@ class Model_Utils:
                 self.model, train_x, train_y, log_file
             )
 
+            self.model = self.model_grid.best_estimator_
+
             self.log_writer.log(
-                f"Got best params for {self.model.__class__.__name__} model", **log_dic
+                f"Got {self.model.__class__.__name__} model refitted with best params",
+                **log_dic,
             )
 
-            self.model.set_params(**self.model_best_params)
+            start = perf_counter()
+
+            self.preds = self.model.predict(test_x)
+
+            self.model_timings[model_name] = {
+                "search_time": get_search_time(self.model_grid),
+                "refit_time": self.model_grid.refit_time_,
+                "predict_time": perf_counter() - start,
+            }
 
             self.log_writer.log(
-                f"Set the best params for {self.model.__class__.__name__} model",
+                f"Used {self.model.__class__.__name__} model for getting predictions, timings are {self.model_timings[model_name]}",
                 **log_dic,
             )
 
+            self.model_score = self.get_model_score(
+                self.model, test_x, test_y, log_file, self.preds
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return self.model_score, self.model, self.model.__class__.__name__
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_search_strategy(self, model_name):
+        """
+        Method Name :   get_search_strategy
+        Description :   This method gets the search strategy of the model from model_search strategy in params.yaml,
+                        method is grid, random (with n_iter) or halving (with resource and factor) and defaults to grid
+
+        Output      :   A dict of search strategy is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        strategy = {
+            "method": "grid",
+            "n_iter": 10,
+            "resource": "n_samples",
+            "factor": 3,
+        }
+
+        strategy.update(self.search_strategies.get(model_name) or {})
+
+        if strategy["method"] not in ("grid", "random", "halving"):
+            raise ValueError(
+                f"{strategy['method']} is not a valid search method for {model_name} model, expected grid, random or halving"
+            )
+
+        return strategy
+
+    def get_search_cv(self, model, log_file):
+        """
+        Method Name :   get_search_cv
+        Description :   This method gets the search cv of the model as per its search strategy. For halving search by
+                        a model param like n_estimators, the param is removed from the grid and its min and max values
+                        are used as min and max resources
+
+        Output      :   GridSearchCV, RandomizedSearchCV or HalvingGridSearchCV object is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_search_cv.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            model_name = model.__class__.__name__
+
+            param_grid = dict(self.config["train_model"][model_name])
+
+            strategy = self.get_search_strategy(model_name)
+
+            if strategy["method"] == "random":
+                search_cv = RandomizedSearchCV(
+                    model,
+                    param_grid,
+                    n_iter=strategy["n_iter"],
+                    random_state=self.random_state,
+                    **self.tuner_kwargs,
+                )
+
+            elif strategy["method"] == "halving":
+                resource_kwargs = {}
+
+                if strategy["resource"] != "n_samples":
+                    resources = param_grid.pop(strategy["resource"])
+
+                    resource_kwargs = {
+                        "min_resources": min(resources),
+                        "max_resources": max(resources),
+                    }
+
+                search_cv = HalvingGridSearchCV(
+                    model,
+                    param_grid,
+                    resource=strategy["resource"],
+                    factor=strategy["factor"],
+                    random_state=self.random_state,
+                    **resource_kwargs,
+                    **self.tuner_kwargs,
+                )
+
+            else:
+                search_cv = GridSearchCV(model, param_grid, **self.tuner_kwargs)
+
             self.log_writer.log(
-                f"Fitting the best parameters for {self.model.__class__.__name__} model",
-                **log_dic,
+                f"Got {search_cv.__class__.__name__} for {model_name} model", **log_dic
             )
 
-            self.model.fit(train_x, train_y)
+            self.log_writer.start_log("exit", **log_dic)
+
+            return search_cv
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_search_candidates(self, model_name, log_file):
+        """
+        Method Name :   get_search_candidates
+        Description :   This method gets the base model with single threaded n_jobs params and the list of params
+                        to be searched for the model, all the params of the grid for grid search and n_iter
+                        sampled params for random search
+
+        Output      :   A tuple of base model and list of params is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_search_candidates.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            model = self.get_base_model(model_name, log_file)
+
+            n_jobs_params = {
+                k: 1 for k in self.n_jobs_params if k in model.get_params()
+            }
+
+            model.set_params(**n_jobs_params)
+
+            param_grid = self.config["train_model"][model_name]
+
+            strategy = self.get_search_strategy(model_name)
+
+            if strategy["method"] == "random":
+                n_iter = min(strategy["n_iter"], len(ParameterGrid(param_grid)))
+
+                candidates = list(
+                    ParameterSampler(
+                        param_grid, n_iter=n_iter, random_state=self.random_state
+                    )
+                )
+
+            else:
+                candidates = list(ParameterGrid(param_grid))
 
             self.log_writer.log(
-                f"{self.model.__class__.__name__} model is trained with best parameters",
+                f"Got {len(candidates)} candidate params for {model_name} model",
                 **log_dic,
             )
 
-            self.preds = self.model.predict(test_x)
+            self.log_writer.start_log("exit", **log_dic)
+
+            return model, candidates
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def get_tuned_models(self, model_names, train_x, train_y, test_x, test_y, log_file):
+        """
+        Method Name :   get_tuned_models
+        Description :   This method tunes all the models together as one pool of (model, params, fold) tasks sharing
+                        n_jobs workers, so that the total time is close to the largest search instead of the sum of
+                        them. The best params of each model are refitted on the train data in parallel as well and
+                        the n_jobs params of the refitted models are restored. Models with halving search strategy
+                        depend on the previous rounds, so they are searched with their own search cv. The search
+                        time of a model is the sum of the fit times of its fold tasks and is kept with the refit and
+                        predict times in model_timings
+
+        Output      :   A list of tuple of model score, tuned model and model name is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_tuned_models.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            halving_models = [
+                model_name
+                for model_name in model_names
+                if self.get_search_strategy(model_name)["method"] == "halving"
+            ]
+
+            searches = {
+                model_name: self.get_search_candidates(model_name, log_file)
+                for model_name in model_names
+                if model_name not in halving_models
+            }
+
+            folds = list(KFold(n_splits=self.tuner_kwargs["cv"]).split(train_x))
+
+            tasks = [
+                (model_name, i, train_idx, test_idx)
+                for model_name, (_, candidates) in searches.items()
+                for i in range(len(candidates))
+                for train_idx, test_idx in folds
+            ]
 
             self.log_writer.log(
-                f"Used {self.model.__class__.__name__} model for getting predictions",
+                f"Running {len(tasks)} search tasks for {model_names} models with {self.tuner_kwargs['n_jobs']} n_jobs",
                 **log_dic,
             )
 
-            self.model_score = self.get_model_score(
-                self.model, test_x, test_y, log_file
+            parallel = Parallel(
+                n_jobs=self.tuner_kwargs["n_jobs"], verbose=self.tuner_kwargs["verbose"]
+            )
+
+            results = parallel(
+                delayed(fit_and_score)(
+                    searches[model_name][0],
+                    searches[model_name][1][i],
+                    train_x,
+                    train_y,
+                    train_idx,
+                    test_idx,
+                )
+                for model_name, i, train_idx, test_idx in tasks
+            )
+
+            fold_scores, search_times = defaultdict(list), defaultdict(float)
+
+            for (model_name, i, _, _), (_, score, fit_time) in zip(tasks, results):
+                fold_scores[(model_name, i)].append(score)
+
+                search_times[model_name] += fit_time
+
+            best_params = {}
+
+            for model_name, (_, candidates) in searches.items():
+                mean_scores = [
+                    np.mean(fold_scores[(model_name, i)])
+                    for i in range(len(candidates))
+                ]
+
+                best_params[model_name] = candidates[int(np.argmax(mean_scores))]
+
+                self.log_writer.log(
+                    f"Found {best_params[model_name]} as best params for {model_name} model with {max(mean_scores)} cv score",
+                    **log_dic,
+                )
+
+            refitted_models = parallel(
+                delayed(fit_and_score)(
+                    searches[model_name][0], best_params[model_name], train_x, train_y
+                )
+                for model_name in searches
             )
 
+            models, refit_times = {}, {}
+
+            for model_name, (model, _, fit_time) in zip(searches, refitted_models):
+                models[model_name], refit_times[model_name] = model, fit_time
+
+            for model_name in halving_models:
+                model, _ = self.get_search_candidates(model_name, log_file)
+
+                search_cv = self.get_search_cv(model, log_file)
+
+                search_cv.fit(train_x, train_y)
+
+                models[model_name] = search_cv.best_estimator_
+
+                search_times[model_name] = get_search_time(search_cv)
+
+                refit_times[model_name] = search_cv.refit_time_
+
+                self.log_writer.log(
+                    f"Found {search_cv.best_params_} as best params for {model_name} model with {search_cv.best_score_} cv score",
+                    **log_dic,
+                )
+
+            lst = []
+
+            for model_name in model_names:
+                model = models[model_name]
+
+                base_params = self.get_base_model(model_name, log_file).get_params()
+
+                n_jobs_params = {
+                    k: base_params[k] for k in self.n_jobs_params if k in base_params
+                }
+
+                model.set_params(**n_jobs_params)
+
+                start = perf_counter()
+
+                preds = model.predict(test_x)
+
+                self.model_timings[model_name] = {
+                    "search_time": search_times[model_name],
+                    "refit_time": refit_times[model_name],
+                    "predict_time": perf_counter() - start,
+                }
+
+                model_score = self.get_model_score(
+                    model, test_x, test_y, log_file, preds
+                )
+
+                lst.append((model_score, model, model.__class__.__name__))
+
             self.log_writer.start_log("exit", **log_dic)
 
-            return self.model_score, self.model, self.model.__class__.__name__
+            return lst
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def save_model(self, model, log_file):
+    def save_model(self, model, log_file, model_name=None):
         """
         Method Name :   save_model
-        Description :   This method saves the trained model to train model folder
+        Description :   This method saves the trained model to train model folder, model_name defaults to the class name
 
         Output      :   Trained model is saved to train model folder
         On Failure  :   Write an exception log and then raise an exception
@@ -242,7 +622,10 @@ class Model_Utils:
                 "Starting saving trained model to trained model folder", **log_dic
             )
 
-            model_filename = model.__class__.__name__ + self.save_format
+            if model_name is None:
+                model_name = model.__class__.__name__
+
+            model_filename = model_name + self.save_format
 
             model_file = join(self.trained_models_dir, model_filename)
 
@@ -392,14 +775,7 @@ class Model_Utils:
         try:
             self.log_writer.log("Getting the model file based on the stage", **log_dic)
 
-            model_file = (
-                self.config["dir"]["artifacts"]
-                + "/"
-                + self.config["model_dir"][stage]
-                + "/"
-                + model
-                + self.config["save_format"]
-            )
+            model_file = self.config.model_file(model, stage)
 
             self.log_writer.log("Got model file based on the stage", **log_dic)
 
@@ -410,10 +786,72 @@ class Model_Utils:
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
+    def get_prod_files(self, log_file):
+        """
+        Method Name :   get_prod_files
+        Description :   This method gets the prod model file and the prod preprocessor file as one pair, which are the
+                        files of the push named by the prod manifest. The latest pushed model and the prod
+                        preprocessor file are used if there is no manifest
+
+        Output      :   A tuple of prod model file and prod preprocessor file is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_prod_files.__name__, __file__, log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            prod_model_dir = self.config.model_dir("prod")
+
+            prod_manifest = self.get_prod_manifest(log_file)
+
+            if prod_manifest is not None:
+                prod_model_file = join(prod_model_dir, prod_manifest["model_file"])
+
+                prod_preprocessor_file = join(
+                    prod_model_dir, prod_manifest["preprocessor_file"]
+                )
+
+            else:
+                prod_model_files = [
+                    f
+                    for f in listdir(prod_model_dir)
+                    if f.endswith(self.save_format)
+                    and f.split(".")[0] != self.preprocessor_name
+                ]
+
+                model_name = max(
+                    prod_model_files, key=lambda f: getmtime(join(prod_model_dir, f))
+                ).split(".")[0]
+
+                prod_model_file = prod_model_dir + "/" + model_name + self.save_format
+
+                prod_preprocessor_file = self.config.model_file(
+                    self.preprocessor_name, "prod"
+                )
+
+            self.log_writer.log(
+                f"Got {prod_model_file} and {prod_preprocessor_file} as prod files",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return prod_model_file, prod_preprocessor_file
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
     def get_prod_model_file(self, log_file):
         """
         Method Name :   get_prod_model_name
-        Description :   This method gets the prod model name for getting predictions
+        Description :   This method gets the prod model name for getting predictions, the model of the prod manifest
+                        is used and the latest pushed model if there is no manifest
 
         Output      :   Prod model name is returned for getting predictions
         On Failure  :   Write an exception log and then raise an exception
@@ -433,13 +871,7 @@ class Model_Utils:
         try:
             self.log_writer.log("Getting prod model name for prediction", **log_dic)
 
-            prod_model_dir = (
-                self.config["dir"]["artifacts"] + "/" + self.config["model_dir"]["prod"]
-            )
-
-            model_name = listdir(prod_model_dir)[0].split(".")[0]
-
-            model_name = prod_model_dir + "/" + model_name + self.save_format
+            model_name, _ = self.get_prod_files(log_file)
 
             self.log_writer.log("Got the prod model name for prediction", **log_dic)
 
@@ -449,3 +881,41 @@ class Model_Utils:
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
+
+    def get_prod_manifest(self, log_file):
+        """
+        Method Name :   get_prod_manifest
+        Description :   This method reads the prod manifest, which is written after the prod model and preprocessor
+                        files of a push are in place, so that a model is only served once it is completely pushed
+
+        Output      :   A dict of prod model name, model file and preprocessor file relative to the prod model
+                        folder and push time is returned, None if there is no manifest
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__,
+            self.get_prod_manifest.__name__,
+            __file__,
+            log_file,
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            prod_manifest = None
+
+            if isfile(self.prod_manifest_file):
+                with open(self.prod_manifest_file) as f:
+                    prod_manifest = json_load(f)
+
+                self.log_writer.log(f"Got {prod_manifest} as prod manifest", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return prod_manifest
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
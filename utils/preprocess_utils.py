@@ -1,4 +1,6 @@
+import numpy as np
 from category_encoders import OneHotEncoder, OrdinalEncoder
+from pandas import DataFrame, Series, concat, isna
 
 from utils.logger import App_Logger
 from utils.read_params import get_log_dic
@@ -10,7 +12,137 @@ class Preprocess_Utils:
 
         self.log_writer = App_Logger()
 
-    def one_hot_encoding(self, data, column):
+    def get_lookup(self, encoder):
+        """
+        Method Name :   get_lookup
+        Description :   This method precomputes the output of the fitted encoder for each known category of its
+                        columns, missing values are keyed by None. The encoder itself is run once on the known
+                        categories so that the lookup gives the same values and dtypes as the encoder
+
+        Output      :   A dict of column and its output columns, dtype and dict of encoded values is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.get_lookup.__name__, __file__, self.log_file
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            categories = {
+                m["col"]: [c for c in m["mapping"].index if not isna(c)] + [None]
+                for m in getattr(encoder, "ordinal_encoder", encoder).mapping
+            }
+
+            n_rows = max(len(c) for c in categories.values())
+
+            probe = DataFrame(
+                {
+                    col: (
+                        Series(
+                            categories[col] + [None] * (n_rows - len(categories[col]))
+                        )
+                        if col in categories
+                        else Series([0.0] * n_rows)
+                    )
+                    for col in encoder.feature_names_in_
+                }
+            )
+
+            encoded = encoder.transform(probe)
+
+            lookup = {}
+
+            for m in encoder.mapping:
+                col = m["col"]
+
+                out_cols = list(getattr(m["mapping"], "columns", [col]))
+
+                values = encoded[out_cols].values.tolist()
+
+                lookup[col] = {
+                    "columns": out_cols,
+                    "dtype": encoded[out_cols].values.dtype,
+                    "values": {
+                        category: tuple(values[i])
+                        for i, category in enumerate(categories[col])
+                    },
+                }
+
+            self.log_writer.log(
+                f"Precomputed lookup of {list(lookup)} columns for {encoder.__class__.__name__}",
+                **log_dic,
+            )
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return lookup
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
+
+    def apply_lookup(self, data, lookup):
+        """
+        Method Name :   apply_lookup
+        Description :   This method encodes the columns of the dataframe with dict lookups, which is faster than the
+                        encoder for the few records of an online request
+
+        Output      :   An encoded dataframe is returned, None if a value is not in the lookup
+        On Failure  :   Raise an exception
+        """
+        encoded = {}
+
+        for col, col_lookup in lookup.items():
+            values = col_lookup["values"]
+
+            keys = [None if isna(v) else v for v in data[col]]
+
+            if not all(k in values for k in keys):
+                return None
+
+            encoded[col] = np.array(
+                [values[k] for k in keys], dtype=col_lookup["dtype"]
+            )
+
+        data, blocks, start = data.copy(deep=False), [], 0
+
+        for i, col in enumerate(data.columns):
+            if col not in lookup:
+                continue
+
+            if lookup[col]["columns"] == [col]:
+                data[col] = encoded[col][:, 0]
+
+                continue
+
+            block = DataFrame(
+                encoded[col], columns=lookup[col]["columns"], index=data.index
+            )
+
+            blocks += [data.iloc[:, start:i], block]
+
+            start = i + 1
+
+        if not blocks:
+            return data
+
+        return concat(blocks + [data.iloc[:, start:]], axis=1)
+
+    def one_hot_encoding(self, data, column, one_hot_encoder=None, lookup=None):
+        """
+        Method Name :   one_hot_encoding
+        Description :   This method applies one hot encoding to the columns, if a fitted encoder is passed
+                        it is only used for transforming the data, with the lookup of the encoder if given
+
+        Output      :   A tuple of encoded dataframe and fitted encoder is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
         log_dic = get_log_dic(
             self.__class__.__name__,
             self.one_hot_encoding.__name__,
@@ -23,22 +155,40 @@ class Preprocess_Utils:
                 "Applying one hot encoder to selected columns", **log_dic
             )
 
-            one_hot_encoder = OneHotEncoder(
-                cols=column, return_df=True, use_cat_names=True
-            )
+            if one_hot_encoder is None:
+                one_hot_encoder = OneHotEncoder(
+                    cols=column, return_df=True, use_cat_names=True
+                )
 
-            data_final = one_hot_encoder.fit_transform(data)
+                data_final = one_hot_encoder.fit_transform(data)
+
+            else:
+                data_final = None if lookup is None else self.apply_lookup(data, lookup)
+
+                if data_final is None:
+                    data_final = one_hot_encoder.transform(data)
 
             self.log_writer.log("Applied one hot encoder to columns", **log_dic)
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return data_final
+            return data_final, one_hot_encoder
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
 
-    def ordinal_encoding(self, data, column):
+    def ordinal_encoding(self, data, column, ordinal_encoder=None, lookup=None):
+        """
+        Method Name :   ordinal_encoding
+        Description :   This method applies ordinal encoding to the columns, if a fitted encoder is passed
+                        it is only used for transforming the data, with the lookup of the encoder if given
+
+        Output      :   A tuple of encoded dataframe and fitted encoder is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
         log_dic = get_log_dic(
             self.__class__.__name__,
             self.ordinal_encoding.__name__,
@@ -54,9 +204,16 @@ class Preprocess_Utils:
                 **log_dic
             )
 
-            ordinal_encoder = OrdinalEncoder(cols=column, return_df=True)
+            if ordinal_encoder is None:
+                ordinal_encoder = OrdinalEncoder(cols=column, return_df=True)
+
+                df_final = ordinal_encoder.fit_transform(data)
+
+            else:
+                df_final = None if lookup is None else self.apply_lookup(data, lookup)
 
-            df_final = ordinal_encoder.fit_transform(data)
+                if df_final is None:
+                    df_final = ordinal_encoder.transform(data)
 
             self.log_writer.log(
                 "Applied ordinal encoding to dataframe for particular cols", **log_dic
@@ -64,7 +221,7 @@ class Preprocess_Utils:
 
             self.log_writer.start_log("exit", **log_dic)
 
-            return df_final
+            return df_final, ordinal_encoder
 
         except Exception as e:
             self.log_writer.exception_log(e, **log_dic)
@@ -1,12 +1,109 @@
+from os import environ, stat
+from threading import Lock
+
 from yaml import safe_load
 
+_config_cache = {}
+
+_config_lock = Lock()
+
+
+class Frozen_Dict(dict):
+    """
+    Description :   This class is a read only dict for the parsed params, so that the cached params shared by all
+                    the objects of a process cannot be changed by one of them
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __readonly__(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} object is read only")
+
+    __setitem__ = __delitem__ = __readonly__
+
+    clear = pop = popitem = setdefault = update = __readonly__
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+class Frozen_List(list):
+    """
+    Description :   This class is a read only list for the parsed params, it is still a list so that it can be
+                    passed to pandas and sklearn as is
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __readonly__(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} object is read only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = __readonly__
+
+    append = clear = extend = insert = pop = remove = reverse = sort = __readonly__
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+
+class Params(Frozen_Dict):
+    """
+    Description :   This class is the read only params of params.yaml file with accessors for the sections used
+                    by the pipeline
+    Version     :   1.2
 
-def read_params(config_path="config/params.yaml"):
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def artifacts_dir(self):
+        return self["dir"]["artifacts"]
+
+    def good_data_dir(self, key):
+        return self["data"][key]["good_data_dir"]
+
+    def bad_data_dir(self, key):
+        return self["data"][key]["bad_data_dir"]
+
+    def model_dir(self, stage):
+        return self.artifacts_dir() + "/" + self["model_dir"][stage]
+
+    def model_file(self, model, stage):
+        return self.model_dir(stage) + "/" + model + self["save_format"]
+
+    def schema_file(self, key):
+        return self["schema_file"][key]
+
+
+def freeze(obj):
+    """
+    Method Name :   freeze
+    Description :   This method converts the parsed yaml to read only dicts and lists
+
+    Output      :   Read only params are returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if isinstance(obj, dict):
+        return Frozen_Dict((k, freeze(v)) for k, v in obj.items())
+
+    if isinstance(obj, list):
+        return Frozen_List(freeze(v) for v in obj)
+
+    return obj
+
+
+def read_params(config_path=None):
     """
     Method Name :   read_params
-    Description :   This method reads the parameters from params.yaml file
+    Description :   This method reads the parameters from params.yaml file, the parsed params are cached per
+                    process and parsed again only when the mtime of the file changes. The config path defaults
+                    to SHIPPING_PARAMS env variable if set else config/params.yaml
 
-    Output      :   Parameters are read from the params.yaml file
+    Output      :   Read only parameters are returned
     On Failure  :   Write an exception log and then raise an exception
 
     Version     :   1.2
@@ -15,8 +112,21 @@ def read_params(config_path="config/params.yaml"):
     method_name = read_params.__name__
 
     try:
-        with open(config_path) as f:
-            config = safe_load(f)
+        if config_path is None:
+            config_path = environ.get("SHIPPING_PARAMS", "config/params.yaml")
+
+        mtime = stat(config_path).st_mtime_ns
+
+        cached = _config_cache.get(config_path)
+
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with _config_lock:
+            with open(config_path) as f:
+                config = Params((k, freeze(v)) for k, v in safe_load(f).items())
+
+            _config_cache[config_path] = (mtime, config)
 
         return config
 
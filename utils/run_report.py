@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from datetime import datetime
+from json import dump
+from os import listdir, makedirs, replace
+from os.path import isdir, join
+from resource import RUSAGE_CHILDREN, RUSAGE_SELF, getrusage
+from time import perf_counter
+
+from utils.logger import App_Logger
+from utils.read_params import get_log_dic, read_params
+
+
+def get_cpu_time():
+    """
+    Method Name :   get_cpu_time
+    Description :   This method gets the user and system cpu time of the process and of its finished child processes
+
+    Output      :   Cpu time in seconds is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return sum(
+        usage.ru_utime + usage.ru_stime
+        for usage in (getrusage(RUSAGE_SELF), getrusage(RUSAGE_CHILDREN))
+    )
+
+
+def get_max_rss_mb():
+    """
+    Method Name :   get_max_rss_mb
+    Description :   This method gets the peak resident memory of the process or of its largest finished child
+                    process, the peak is over the life of the process and not reset between stages
+
+    Output      :   Peak resident memory in MB is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return (
+        max(getrusage(RUSAGE_SELF).ru_maxrss, getrusage(RUSAGE_CHILDREN).ru_maxrss)
+        / 1024
+    )
+
+
+def count_files(folder):
+    """
+    Method Name :   count_files
+    Description :   This method counts the files of the folder
+
+    Output      :   Number of files is returned, 0 if the folder does not exist
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    return len(listdir(folder)) if isdir(folder) else 0
+
+
+class Run_Report:
+    """
+    Description :   This class records wall time, cpu time, peak memory, rows and files of each stage of a train or
+                    pred run and writes them as json run report under the artifacts folder
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, kind):
+        self.config = read_params()
+
+        self.kind = kind
+
+        self.report_dir = join(
+            self.config.artifacts_dir(), self.config["run_report"]["dir"]
+        )
+
+        self.run_report_log = self.config["log"]["run_report"]
+
+        self.log_writer = App_Logger()
+
+        self.started = datetime.now()
+
+        self.report = {
+            "kind": kind,
+            "started_at": self.started.isoformat(),
+            "finished_at": None,
+            "status": "running",
+            "stages": {},
+        }
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Method Name :   stage
+        Description :   This method records the stage run in the with block, the yielded dict can be updated with
+                        rows_in, rows_out, files_accepted, files_rejected or search, refit and predict times of the
+                        models of the stage
+
+        Output      :   Wall time, cpu time, peak memory and status of the stage are recorded
+        On Failure  :   The stage is recorded as failed and the exception is raised again
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        stage_dic = {"status": "running"}
+
+        self.report["stages"][name] = stage_dic
+
+        start_wall, start_cpu = perf_counter(), get_cpu_time()
+
+        try:
+            yield stage_dic
+
+            stage_dic["status"] = "done"
+
+        except Exception as e:
+            stage_dic.update(status="failed", error=str(e))
+
+            raise e
+
+        finally:
+            stage_dic.update(
+                wall_time=round(perf_counter() - start_wall, 3),
+                cpu_time=round(get_cpu_time() - start_cpu, 3),
+                max_rss_mb=round(get_max_rss_mb(), 1),
+            )
+
+    def save(self, status="done"):
+        """
+        Method Name :   save
+        Description :   This method writes the run report as json file named with the kind and start time of the run,
+                        the file is written to a temporary file first so that a partial report is never read
+
+        Output      :   Run report file is written and its path is returned
+        On Failure  :   Write an exception log and then raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        log_dic = get_log_dic(
+            self.__class__.__name__, self.save.__name__, __file__, self.run_report_log
+        )
+
+        self.log_writer.start_log("start", **log_dic)
+
+        try:
+            self.report.update(status=status, finished_at=datetime.now().isoformat())
+
+            makedirs(self.report_dir, exist_ok=True)
+
+            report_file = join(
+                self.report_dir,
+                f"{self.kind}_run_{self.started.strftime('%Y%m%d_%H%M%S')}.json",
+            )
+
+            with open(report_file + ".tmp", "w") as f:
+                dump(self.report, f, indent=2, default=str)
+
+            replace(report_file + ".tmp", report_file)
+
+            self.log_writer.log(f"Saved run report to {report_file} file", **log_dic)
+
+            self.log_writer.start_log("exit", **log_dic)
+
+            return report_file
+
+        except Exception as e:
+            self.log_writer.exception_log(e, **log_dic)
@@ -0,0 +1,290 @@
+from atexit import register
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from json import dump
+from os import getpid, makedirs, replace
+from os.path import join
+from random import random
+from threading import Lock, Thread, get_ident, local
+from time import monotonic, perf_counter_ns
+
+from utils.read_params import read_params
+
+_tracer = {"pid": None, "tracer": None}
+
+_tracer_lock = Lock()
+
+
+class Tracer:
+    """
+    Description :   This class records nested spans of the current thread with monotonic durations and exports the
+                    finished spans of the process as chrome trace json file, which can be opened in chrome://tracing,
+                    perfetto or speedscope as a flamegraph. A whole call tree is kept or dropped as per sample_rate
+                    and the buffered spans are flushed to a new trace file every flush_spans spans or flush_interval
+                    seconds, so that a long running process neither grows nor waits for exit to export
+    Version     :   1.2
+
+    Revisions   :   Moved to setup to cloud
+    """
+
+    def __init__(self, tracing_params, trace_dir):
+        self.enabled = tracing_params["enabled"]
+
+        self.sample_rate = tracing_params["sample_rate"]
+
+        self.flush_spans = tracing_params["flush_spans"]
+
+        self.flush_interval = tracing_params["flush_interval"]
+
+        self.trace_dir = trace_dir
+
+        self.lock = Lock()
+
+        self.local = local()
+
+        self.events = []
+
+        self.last_flush = monotonic()
+
+        self.flushing = False
+
+        self.n_files = 0
+
+    def set_sample_rate(self, sample_rate):
+        """
+        Method Name :   set_sample_rate
+        Description :   This method sets the sample rate of the call trees started after it, it is used by the app
+                        process to sample serving requests at a lower rate than batch jobs
+
+        Output      :   Sample rate is set
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.sample_rate = sample_rate
+
+    def get_stack(self):
+        """
+        Method Name :   get_stack
+        Description :   This method gets the stack of open spans of the current thread
+
+        Output      :   A list of open spans is returned
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        stack = getattr(self.local, "stack", None)
+
+        if stack is None:
+            stack = self.local.stack = []
+
+        return stack
+
+    def start_span(self, name, cat="method"):
+        """
+        Method Name :   start_span
+        Description :   This method opens a span in the current thread, a root span decides by sample_rate if the
+                        call tree under it is recorded
+
+        Output      :   A span is opened
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if not self.enabled:
+            return
+
+        stack = self.get_stack()
+
+        sampled = stack[-1][2] if stack else random() < self.sample_rate
+
+        stack.append((name, perf_counter_ns(), sampled, cat))
+
+    def end_span(self, name, error=None):
+        """
+        Method Name :   end_span
+        Description :   This method closes the innermost open span of the name, spans opened inside it and not
+                        closed, as by a method returning before its exit log, are closed with it
+
+        Output      :   Span is closed and recorded if sampled, a flush is started in a background thread once the
+                        buffer is full or flush_interval has passed
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        if not self.enabled:
+            return
+
+        stack = self.get_stack()
+
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                break
+
+        else:
+            return
+
+        end = perf_counter_ns()
+
+        spans, stack[i:] = stack[i:], []
+
+        if not spans[0][2]:
+            return
+
+        with self.lock:
+            for span_name, start, _, cat in reversed(spans):
+                event = {
+                    "name": span_name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": start // 1000,
+                    "dur": (end - start) // 1000,
+                    "pid": getpid(),
+                    "tid": get_ident(),
+                }
+
+                if error is not None and span_name == name:
+                    event["args"] = {"error": error}
+
+                self.events.append(event)
+
+            flush = not self.flushing and (
+                len(self.events) >= self.flush_spans
+                or monotonic() - self.last_flush >= self.flush_interval
+            )
+
+            if flush:
+                self.flushing = True
+
+        if flush:
+            Thread(target=self.export, daemon=True).start()
+
+    @contextmanager
+    def span(self, name, cat="span"):
+        """
+        Method Name :   span
+        Description :   This method records the with block as a span, the span is marked with the error if the
+                        block raises an exception
+
+        Output      :   The with block is recorded as a span
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        self.start_span(name, cat)
+
+        error = None
+
+        try:
+            yield
+
+        except Exception as e:
+            error = str(e)
+
+            raise e
+
+        finally:
+            self.end_span(name, error)
+
+    def export(self, trace_file=None):
+        """
+        Method Name :   export
+        Description :   This method writes the recorded spans as chrome trace json file and clears them, the file
+                        is named with the process id, time and file number if trace_file is not given
+
+        Output      :   Trace file is written and its path is returned, None if no span is recorded
+        On Failure  :   Raise an exception
+
+        Version     :   1.2
+        Revisions   :   moved setup to cloud
+        """
+        with self.lock:
+            events, self.events = self.events, []
+
+            self.last_flush = monotonic()
+
+            self.n_files += 1
+
+            n_file = self.n_files
+
+        try:
+            if not events:
+                return None
+
+            if trace_file is None:
+                makedirs(self.trace_dir, exist_ok=True)
+
+                stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+                trace_file = join(
+                    self.trace_dir, f"trace_{getpid()}_{stamp}_{n_file:05d}.json"
+                )
+
+            with open(trace_file + ".tmp", "w") as f:
+                dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+            replace(trace_file + ".tmp", trace_file)
+
+            return trace_file
+
+        finally:
+            self.flushing = False
+
+
+def get_tracer():
+    """
+    Method Name :   get_tracer
+    Description :   This method gets the tracer of the current process, the tracer is configured once per process
+                    from tracing in params.yaml and the remaining spans are exported at exit
+
+    Output      :   A tracer is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+    if _tracer["pid"] == getpid():
+        return _tracer["tracer"]
+
+    with _tracer_lock:
+        if _tracer["pid"] != getpid():
+            config = read_params()
+
+            tracing_params = config["tracing"]
+
+            tracer = Tracer(
+                tracing_params, join(config.artifacts_dir(), tracing_params["dir"])
+            )
+
+            if tracer.enabled:
+                register(tracer.export)
+
+            _tracer.update({"pid": getpid(), "tracer": tracer})
+
+    return _tracer["tracer"]
+
+
+def traced(func):
+    """
+    Method Name :   traced
+    Description :   This decorator records each call of the function as a span named with its qualified name
+
+    Output      :   A wrapped function is returned
+    On Failure  :   Raise an exception
+
+    Version     :   1.2
+    Revisions   :   moved setup to cloud
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_tracer().span(func.__qualname__, "function"):
+            return func(*args, **kwargs)
+
+    return wrapper